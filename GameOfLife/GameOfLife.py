@@ -1,11 +1,16 @@
 import pygame
-import numpy as np
-import random
+import os
 import sys
-import json
+from bisect import bisect_left
 
-
-pygame.init()
+from life_core import BACKENDS, LifeSimulation
+from life_runner import SimulationRunner
+from patterns import PatternLibrary
+from history import HistoryRecorder
+from renderer import GridRenderer
+from camera import Camera
+from profiler import PHASES, FrameProfiler
+from rules import NAMED_RULES
 
 BLACK = (20, 20, 20)
 WHITE = (255, 255, 255)
@@ -17,18 +22,22 @@ BLUE = (33, 150, 243)
 ORANGE = (255, 152, 0)
 PURPLE = (156, 39, 176)
 
+JUMP_GENERATIONS = 1024
+MAX_GRID_WIDTH = 4000
+MAX_GRID_HEIGHT = 4000
+CYCLE_HISTORY = 256  # generations kept for spotting still lifes and oscillators, once turned on
+PATTERN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "patterns")
+
 class GameOfLife:
-    def __init__(self):
+    def __init__(self, profile_path=None, cycle_history=0, record_history=False):
+        pygame.init()
+        
         self.width = 1200
         self.height = 800
         self.control_height = 120
         self.grid_width = 50
         self.grid_height = 40
-        self.cell_size = 15
-        self.running = False
         self.speed = 100  # milliseconds between generations
-        self.generation = 0
-        self.population = 0
         
         # Initialize display
         self.screen = pygame.display.set_mode((self.width, self.height))
@@ -37,17 +46,46 @@ class GameOfLife:
         self.font = pygame.font.Font(None, 24)
         self.small_font = pygame.font.Font(None, 18)
         self.score = pygame.font.Font(None, 22)
+        self.text_cache = {}
+        self.renderer = GridRenderer(WHITE, BLACK, GRAY)
+        self.camera = Camera(pygame.Rect(0, self.control_height, self.width, self.height - self.control_height))
+        self.panning = False
+        self.dirty = True  # something on screen needs redrawing
+        
+        # Simulation state
+        # Cycle detection and history both pack every generation, so they are off unless asked for
+        self.sim = LifeSimulation(self.grid_width, self.grid_height, cycle_history=cycle_history,
+                                  history=HistoryRecorder() if record_history else None)
+        self.runner = SimulationRunner(self.sim, self.speed / 1000)  # steps on its own thread, starts paused
+        self.frame = self.runner.latest  # snapshot being drawn
         
-        # Grid setup
-        self.grid = np.zeros((self.grid_height, self.grid_width), dtype=int)
-        self.next_grid = np.zeros((self.grid_height, self.grid_width), dtype=int)
+        # Frame timing is off (None) unless asked for with O or --profile
+        self.profiler = None
+        if profile_path:
+            self.set_profiler(FrameProfiler(profile_path))
+        self.scrubbing = False
         
         # UI elements
         self.buttons = self.create_buttons()
         self.input_boxes = self.create_input_boxes()
         self.selected_pattern = "Random"
+        self.patterns = PatternLibrary(PATTERN_DIR)  # indexed on first use
         
         self.calculate_grid_size()
+        with self.runner.hold():
+            self.runner.window = self.camera.window()
+            self.runner.publish()
+    
+    @property
+    def running(self):
+        return self.runner.running
+    
+    @running.setter
+    def running(self, running):
+        if running:
+            self.runner.resume()
+        else:
+            self.runner.pause()
         
     def create_buttons(self):
         buttons = []
@@ -105,26 +143,42 @@ class GameOfLife:
         return input_boxes
     
     def calculate_grid_size(self):
-        available_width = self.width - 20
-        available_height = self.height - self.control_height - 20
-        
-        cell_width = available_width // self.grid_width
-        cell_height = available_height // self.grid_height
-        
-        self.cell_size = min(cell_width, cell_height, 20)  # Max cell size of 20
-        self.cell_size = max(self.cell_size, 3)  # Min cell size of 3
-        
-        # Calculate grid offset for centering
-        self.grid_x = (self.width - self.grid_width * self.cell_size) // 2
-        self.grid_y = self.control_height + (self.height - self.control_height - self.grid_height * self.cell_size) // 2
+        # Zoom out far enough to show the whole grid, at most 20 px per cell
+        self.camera.fit(self.grid_width, self.grid_height)
+        self.scrub_rect = pygame.Rect(10, self.height - 8, self.width - 20, 6)
+        self.dirty = True
     
     def handle_events(self):
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if not events:
+            return True
+        self.dirty = True
+        
+        # Hold the simulation still while events change it, then show the result
+        with self.runner.hold():
+            running = self.process_events(events)
+            self.runner.window = self.camera.window()
+            self.runner.publish()
+        return running
+    
+    def process_events(self, events):
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
             
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
+            elif event.type == pygame.MOUSEWHEEL:
+                self.camera.zoom_at(event.y, *pygame.mouse.get_pos())
+            
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+                self.panning = True
+            
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                mouse_pos = event.pos
+                
+                # Scrub bar along the bottom edge
+                if self.scrub_rect.inflate(0, 8).collidepoint(mouse_pos):
+                    self.scrubbing = True
+                    self.scrub_to(mouse_pos[0])
                 
                 # Check button clicks
                 for i, button in enumerate(self.buttons):
@@ -137,12 +191,21 @@ class GameOfLife:
             
                 
                 # Check grid clicks for manual cell placement
-                if not self.running:
-                    grid_x = (mouse_pos[0] - self.grid_x) // self.cell_size
-                    grid_y = (mouse_pos[1] - self.grid_y) // self.cell_size
+                if not self.running and not self.scrubbing and self.camera.view.collidepoint(mouse_pos):
+                    grid_x, grid_y = self.camera.to_cell(*mouse_pos)
                     
-                    if 0 <= grid_x < self.grid_width and 0 <= grid_y < self.grid_height:
-                        self.grid[grid_y, grid_x] = 1 - self.grid[grid_y, grid_x]  # Toggle cell
+                    if self.sim.contains(grid_x, grid_y):
+                        self.toggle_cell(grid_x, grid_y)
+            
+            elif event.type == pygame.MOUSEMOTION and self.scrubbing:
+                self.scrub_to(event.pos[0])
+            
+            elif event.type == pygame.MOUSEMOTION and self.panning:
+                self.camera.pan(*event.rel)
+            
+            elif event.type == pygame.MOUSEBUTTONUP:
+                self.scrubbing = False
+                self.panning = False
             
             elif event.type == pygame.KEYDOWN:
                 # Handle input box typing
@@ -162,6 +225,30 @@ class GameOfLife:
                     self.clear_grid()
                 elif event.key == pygame.K_s:
                     self.step()
+                elif event.key == pygame.K_w:
+                    self.sim.wrap = not self.sim.wrap
+                elif event.key == pygame.K_b:
+                    self.cycle_backend()
+                elif event.key == pygame.K_l:
+                    self.cycle_rule()
+                elif event.key == pygame.K_t:
+                    self.runner.turbo = not self.runner.turbo
+                elif event.key == pygame.K_f:
+                    self.camera.fit(self.grid_width, self.grid_height)
+                elif event.key == pygame.K_o:
+                    self.toggle_profiler()
+                elif event.key == pygame.K_d:
+                    self.toggle_cycle_detection()
+                elif event.key == pygame.K_h:
+                    self.toggle_history()
+                elif event.key == pygame.K_j:
+                    self.jump(JUMP_GENERATIONS)
+                elif event.key == pygame.K_p:
+                    self.next_pattern()
+                elif event.key == pygame.K_LEFT:
+                    self.step_back()
+                elif event.key == pygame.K_RIGHT:
+                    self.step_forward()
         
         return True
     
@@ -187,24 +274,23 @@ class GameOfLife:
             new_speed = int(self.input_boxes[2]['text'])
             
             # Validate inputs
-            new_width = max(10, min(200, new_width))
-            new_height = max(10, min(150, new_height))
+            new_width = max(10, min(MAX_GRID_WIDTH, new_width))
+            new_height = max(10, min(MAX_GRID_HEIGHT, new_height))
             new_speed = max(1, min(2000, new_speed))
             
             self.grid_width = new_width
             self.grid_height = new_height
             self.speed = new_speed
+            self.runner.interval = new_speed / 1000
             
             # Recreate grids
-            self.grid = np.zeros((self.grid_height, self.grid_width), dtype=int)
-            self.next_grid = np.zeros((self.grid_height, self.grid_width), dtype=int)
+            self.sim.resize(self.grid_width, self.grid_height)
             
             # Recalculate grid size
             self.calculate_grid_size()
             
             # Reset simulation
             self.running = False
-            self.generation = 0
             
             # Apply selected pattern
             if self.selected_pattern != "Random":
@@ -216,55 +302,121 @@ class GameOfLife:
     def apply_pattern(self, pattern_name):
         """Apply a predefined pattern to the grid"""
         self.clear_grid()
-        self.randomize_grid()
+        if pattern_name == "Random":
+            self.randomize_grid()
+        else:
+            self.sim.load_pattern(self.patterns.index[pattern_name]['path'])
+    
+    def next_pattern(self):
+        """Select and apply the next pattern from the library"""
+        names = ["Random"] + self.patterns.names()
+        index = names.index(self.selected_pattern) if self.selected_pattern in names else 0
+        self.selected_pattern = names[(index + 1) % len(names)]
+        self.apply_pattern(self.selected_pattern)
     
     def toggle_simulation(self):
         self.running = not self.running
     
+    def cycle_backend(self):
+        """Switch to the next grid backend that can run the current rule, keeping the cells"""
+        names = list(BACKENDS)
+        start = names.index(self.sim.backend)
+        for offset in range(1, len(names)):
+            try:
+                self.sim.set_backend(names[(start + offset) % len(names)])
+                return
+            except ValueError:
+                continue  # e.g. HashLife with a B0 rule
+    
+    def cycle_rule(self):
+        """Switch to the next named rule the current backend can run, keeping the cells"""
+        names = list(NAMED_RULES)
+        start = names.index(self.sim.rule.name) if self.sim.rule.name in names else -1
+        for offset in range(1, len(names) + 1):
+            try:
+                self.sim.set_rule(names[(start + offset) % len(names)])
+                return
+            except ValueError:
+                continue
+    
+    def toggle_cycle_detection(self):
+        """Start or stop watching for still lifes and oscillators"""
+        with self.runner.hold():
+            self.sim.set_cycle_history(0 if self.sim.cycles is not None else CYCLE_HISTORY)
+            self.runner.publish()
+    
+    def toggle_history(self):
+        """Start or stop recording generations for stepping back and scrubbing"""
+        with self.runner.hold():
+            self.sim.set_history(None if self.sim.history is not None else HistoryRecorder())
+            self.runner.publish()
+    
+    def set_profiler(self, profiler):
+        if self.profiler is not None:
+            self.profiler.close()
+        self.profiler = profiler
+        self.runner.profiler = profiler
+    
+    def toggle_profiler(self):
+        """Show or hide the frame timing overlay, profiling only while it is needed"""
+        if self.profiler is None:
+            self.set_profiler(FrameProfiler())
+        elif self.profiler.path is None:
+            self.set_profiler(None)
+        else:
+            self.profiler.visible = not self.profiler.visible  # keep writing the file
+    
     def clear_grid(self):
-        self.grid.fill(0)
-        self.generation = 0
+        self.sim.clear()
         self.running = False
     
     def randomize_grid(self):
-        self.grid = np.random.choice([0, 1], size=(self.grid_height, self.grid_width), p=[0.7, 0.3])
-        self.generation = 0
+        self.sim.randomize(0.3)
     
-    def count_neighbors(self, x, y):
-        """Count living neighbors for a cell"""
-        count = 0
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
-                    continue
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < self.grid_width and 0 <= ny < self.grid_height:
-                    count += self.grid[ny, nx]
-        return count
+    def toggle_cell(self, x, y):
+        self.sim.toggle_cell(x, y)
     
     def step(self):
         """Perform one generation step"""
-        for y in range(self.grid_height):
-            for x in range(self.grid_width):
-                neighbors = self.count_neighbors(x, y)
-                current_cell = self.grid[y, x]
-                
-                # Conway's rules
-                if current_cell == 1:  # Alive
-                    if neighbors < 2 or neighbors > 3:
-                        self.next_grid[y, x] = 0  # Dies
-                    else:
-                        self.next_grid[y, x] = 1  # Lives
-                else:  # Dead
-                    if neighbors == 3:
-                        self.next_grid[y, x] = 1  # Born
-                    else:
-                        self.next_grid[y, x] = 0  # Stays dead
-        
-        # Swap grids
-        self.grid, self.next_grid = self.next_grid, self.grid
-        self.generation += 1
-        self.population = np.sum(self.grid)
+        self.sim.step()
+    
+    def jump(self, generations):
+        self.sim.advance(generations)
+    
+    def step_back(self):
+        """Go back one generation using the recorded history"""
+        if self.sim.history is not None and self.sim.generation - 1 in self.sim.history:
+            self.running = False
+            self.sim.seek(self.sim.generation - 1)
+    
+    def step_forward(self):
+        """Replay the next generation if it is recorded, otherwise compute it"""
+        if self.sim.history is not None and self.sim.generation + 1 in self.sim.history:
+            self.sim.seek(self.sim.generation + 1)
+        else:
+            self.step()
+    
+    def scrub_to(self, mouse_x):
+        """Seek to the recorded generation under the mouse on the scrub bar"""
+        if self.sim.history is None:
+            return
+        generations = self.sim.history.generations
+        if not generations:
+            return
+        self.running = False
+        fraction = min(1.0, max(0.0, (mouse_x - self.scrub_rect.x) / self.scrub_rect.width))
+        target = generations[0] + round(fraction * (generations[-1] - generations[0]))
+        self.sim.seek(generations[min(bisect_left(generations, target), len(generations) - 1)])
+    
+    def render_text(self, font, text, color):
+        """Render a label once and reuse the surface on later frames"""
+        key = (id(font), text, color)
+        surf = self.text_cache.get(key)
+        if surf is None:
+            if len(self.text_cache) > 256:
+                self.text_cache.clear()  # stats text changes every generation
+            surf = self.text_cache[key] = font.render(text, True, color)
+        return surf
     
     def draw_ui(self):
         """Draw the user interface"""
@@ -277,7 +429,7 @@ class GameOfLife:
             pygame.draw.rect(self.screen, color, button['rect'])
             pygame.draw.rect(self.screen, WHITE, button['rect'], 2)
             
-            text_surf = self.small_font.render(button['text'], True, WHITE)
+            text_surf = self.render_text(self.small_font, button['text'], WHITE)
             text_rect = text_surf.get_rect(center=button['rect'].center)
             self.screen.blit(text_surf, text_rect)
         
@@ -288,72 +440,124 @@ class GameOfLife:
             pygame.draw.rect(self.screen, WHITE, box['rect'], 2)
             
             # Label
-            label_surf = self.small_font.render(box['label'], True, WHITE)
+            label_surf = self.render_text(self.small_font, box['label'], WHITE)
             self.screen.blit(label_surf, (box['rect'].x, box['rect'].y + 40))
             
             # Text
-            text_surf = self.small_font.render(box['text'], True, WHITE)
+            text_surf = self.render_text(self.small_font, box['text'], WHITE)
             self.screen.blit(text_surf, (box['rect'].x + 5, box['rect'].y + 5))
         
         # Draw stats
-        stats_text = f"Generation: {self.generation}  |  Population: {self.population}  |  Status: {'Running' if self.running else 'Paused'}"
-        stats_surf = self.score.render(stats_text, True, WHITE)
-        self.screen.blit(stats_surf, (450, 100))
+        frame = self.frame
+        grid_label = frame['backend']
+        if frame['tiles'] is not None:
+            grid_label += f" ({frame['tiles'][0]}/{frame['tiles'][1]} tiles)"
+        target = "turbo" if self.runner.turbo else f"{1000 / self.speed:g}"
+        status = f"Running {frame['rate']:.0f}/{target} gen/s" if self.running else 'Paused'
+        if frame['period'] is not None:
+            status += f" (period {frame['period']} from gen {frame['cycle_start']})"
+        stats_text = (f"Generation: {frame['generation']}  |  Population: {frame['population']}  |  "
+                      f"Rule: {frame['rule']}  |  Grid: {grid_label}  |  Status: {status}")
+        stats_surf = self.render_text(self.score, stats_text, WHITE)
+        self.screen.blit(stats_surf, (300, 100))
         
         # Draw instructions
-        instructions = "Space: Play/Pause  |  R: Random  |  C: Clear  |  S: Step  |  Click cells to toggle"
-        instr_surf = self.small_font.render(instructions, True, LIGHT_GRAY)
-        self.screen.blit(instr_surf, (750, 40))
+        instructions = [
+            "Space: Play/Pause  |  R: Random  |  C: Clear  |  S: Step  |  Click cells to toggle",
+            "W: Wrap edges  |  B: Grid backend  |  L: Rule  |  J: Jump 1024  |  P: Next pattern",
+            "Left/Right: Step back/forward  |  Drag the bottom bar to scrub  |  T: Turbo",
+            "Wheel: Zoom  |  Right-drag: Pan  |  F: Fit grid to window  |  O: Frame timings",
+            f"H: Record history  |  D: Detect cycles  |  Pattern: {self.selected_pattern}",
+        ]
+        for i, line in enumerate(instructions):
+            instr_surf = self.render_text(self.small_font, line, LIGHT_GRAY)
+            self.screen.blit(instr_surf, (750, 25 + i * 15))
+        
+        self.draw_scrub_bar()
+    
+    def draw_scrub_bar(self):
+        """Recorded history as a bar, with the current generation marked"""
+        pygame.draw.rect(self.screen, GRAY, self.scrub_rect)
+        first, last = self.frame['history']
+        if first is None or last == first:
+            return
+        fraction = min(1.0, max(0.0, (self.frame['generation'] - first) / (last - first)))
+        marker_x = self.scrub_rect.x + int(fraction * self.scrub_rect.width)
+        pygame.draw.rect(self.screen, BLUE, (self.scrub_rect.x, self.scrub_rect.y, marker_x - self.scrub_rect.x, self.scrub_rect.height))
+        pygame.draw.rect(self.screen, WHITE, (marker_x - 1, self.scrub_rect.y - 2, 3, self.scrub_rect.height + 4))
+    
+    def draw_profile(self, profiler):
+        """Mean and p95 time of each loop phase over the last frames"""
+        summary = profiler.summary()
+        if not summary:
+            return
+        rows = [("phase", "mean ms", "p95 ms")]
+        for phase in PHASES + ('total',):
+            mean, p95 = summary[phase]
+            rows.append((phase, f"{mean:.2f}", f"{p95:.2f}"))
+        box = pygame.Rect(self.width - 230, self.control_height + 10, 220, 20 + 16 * len(rows))
+        pygame.draw.rect(self.screen, (40, 40, 40), box)
+        pygame.draw.rect(self.screen, LIGHT_GRAY, box, 1)
+        for i, row in enumerate(rows):
+            for text, right in zip(row, (None, box.x + 140, box.x + 205)):
+                surf = self.render_text(self.small_font, text, WHITE)
+                x = box.x + 10 if right is None else right - surf.get_width()
+                self.screen.blit(surf, (x, box.y + 10 + i * 16))
     
     def draw_grid(self):
         """Draw the game grid"""
-        for y in range(self.grid_height):
-            for x in range(self.grid_width):
-                rect = pygame.Rect(
-                    self.grid_x + x * self.cell_size,
-                    self.grid_y + y * self.cell_size,
-                    self.cell_size,
-                    self.cell_size
-                )
-                
-                if self.grid[y, x] == 1:
-                    pygame.draw.rect(self.screen, WHITE, rect)
-                else:
-                    pygame.draw.rect(self.screen, BLACK, rect)
-                
-                # Draw grid lines for larger cells
-                if self.cell_size > 5:
-                    pygame.draw.rect(self.screen, GRAY, rect, 1)
+        self.screen.set_clip(self.camera.view)
+        self.renderer.draw(self.screen, self.frame['view'], self.camera)
+        self.screen.set_clip(None)
     
     def run(self):
-        """Main game loop"""
-        last_update = 0
-        
+        """Main game loop; generations are computed by self.runner"""
         while True:
-            current_time = pygame.time.get_ticks()
-            
+            profiler = self.profiler
+            if profiler:
+                profiler.begin_frame()
             if not self.handle_events():
                 break
+            if profiler:
+                profiler.lap('events')
             
-            # Update simulation
-            if self.running and current_time - last_update > self.speed:
-                self.step()
-                last_update = current_time
-            
-            # Update population count
-            self.population = np.sum(self.grid)
-            
-            # Draw everything
-            self.screen.fill(BLACK)
-            self.draw_grid()
-            self.draw_ui()
-            
-            pygame.display.flip()
+            # Draw the latest published generation, unless nothing has changed since the last frame
+            if self.runner.latest is not self.frame:
+                self.frame = self.runner.latest
+                self.dirty = True
+            if self.dirty:
+                self.frame = self.runner.latest
+                self.screen.fill(BLACK)
+                self.draw_grid()
+                if profiler:
+                    profiler.lap('draw_grid')
+                self.draw_ui()
+                if profiler:
+                    profiler.lap('draw_ui')
+                if profiler and profiler.visible:
+                    self.draw_profile(profiler)
+                
+                pygame.display.flip()
+                if profiler:
+                    profiler.lap('flip')
+                self.dirty = bool(profiler and profiler.visible)  # the overlay changes every frame
+            if profiler:
+                profiler.end_frame()
             self.clock.tick(60)  # 60 FPS
         
+        self.runner.stop()
+        self.set_profiler(None)
+        self.sim.close()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
-    game = GameOfLife()
+    import argparse
+    parser = argparse.ArgumentParser(description="Conway's Game of Life")
+    parser.add_argument('--profile', metavar='PATH', help="write per-frame phase timings to a .csv or .jsonl file")
+    parser.add_argument('--cycle-history', type=int, default=0,
+                        help=f"watch this many generations for repeats from the start (D toggles {CYCLE_HISTORY})")
+    parser.add_argument('--history', action='store_true', help="record generations from the start (H toggles it)")
+    args = parser.parse_args()
+    game = GameOfLife(args.profile, args.cycle_history, args.history)
     game.run()
\ No newline at end of file
@@ -0,0 +1,64 @@
+import math
+
+
+# Pixels per cell: whole pixels when zoomed in, 1 / 2^level when zoomed out so
+# every screen pixel covers an aligned 2^level x 2^level block of cells
+ZOOMS = [1 / 64, 1 / 32, 1 / 16, 1 / 8, 1 / 4, 1 / 2] + list(range(1, 21)) + [24, 32, 40, 48, 64]
+
+
+class Camera:
+    """Zoom and pan over the grid, mapping screen pixels to cells and back
+
+    view is the screen rectangle the grid is drawn in (anything with x, y, w
+    and h). origin_x, origin_y is the screen position of cell (0, 0), kept
+    in whole pixels so cells always land on pixel boundaries.
+    """
+
+    def __init__(self, view, zoom=1):
+        self.view = view
+        self.zoom = zoom
+        self.origin_x = view.x
+        self.origin_y = view.y
+
+    @property
+    def level(self):
+        """Cells per screen pixel as a power of two, 0 when zoomed in"""
+        return 0 if self.zoom >= 1 else round(-math.log2(self.zoom))
+
+    def fit(self, width, height, margin=20, max_zoom=20):
+        """Zoom to show the whole grid and centre it in the view"""
+        scale = min((self.view.w - margin) / width, (self.view.h - margin) / height, max_zoom)
+        self.zoom = max([zoom for zoom in ZOOMS if zoom <= scale], default=ZOOMS[0])
+        self.origin_x = self.view.x + (self.view.w - math.ceil(width * self.zoom)) // 2
+        self.origin_y = self.view.y + (self.view.h - math.ceil(height * self.zoom)) // 2
+
+    def to_cell(self, sx, sy):
+        """Cell under a screen position"""
+        return math.floor((sx - self.origin_x) / self.zoom), math.floor((sy - self.origin_y) / self.zoom)
+
+    def to_screen(self, cx, cy):
+        """Screen position of a cell's top-left corner"""
+        return self.origin_x + round(cx * self.zoom), self.origin_y + round(cy * self.zoom)
+
+    def zoom_at(self, steps, sx, sy):
+        """Move steps along the zoom levels, keeping the point under (sx, sy) still"""
+        index = ZOOMS.index(self.zoom)
+        zoom = ZOOMS[min(len(ZOOMS) - 1, max(0, index + steps))]
+        cx = (sx - self.origin_x) / self.zoom
+        cy = (sy - self.origin_y) / self.zoom
+        self.zoom = zoom
+        self.origin_x = round(sx - cx * zoom)
+        self.origin_y = round(sy - cy * zoom)
+
+    def pan(self, dx, dy):
+        self.origin_x += dx
+        self.origin_y += dy
+
+    def window(self):
+        """(x0, y0, x1, y1, level): the cells inside the view, widened to whole 2^level blocks"""
+        level = self.level
+        x0, y0 = self.to_cell(self.view.x, self.view.y)
+        x1, y1 = self.to_cell(self.view.x + self.view.w - 1, self.view.y + self.view.h - 1)
+        size = 1 << level
+        return (x0 >> level << level, y0 >> level << level,
+                (x1 + size) >> level << level, (y1 + size) >> level << level, level)
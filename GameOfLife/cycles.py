@@ -0,0 +1,64 @@
+import hashlib
+from collections import deque
+
+import numpy as np
+
+
+class CycleDetector:
+    """Spots when the board starts repeating an earlier state
+
+    Keeps a hash and a bit-packed copy of the last `history` generations.
+    When a state repeats, period and cycle_start are set and state_at can
+    produce any later generation with modular arithmetic. Cycles longer
+    than `history` are not detected.
+    """
+
+    def __init__(self, history=256):
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        self.seen = {}
+        self.order = deque()
+        self.snapshots = {}
+        self.shape = None
+        self.last_generation = None
+        self.period = None
+        self.cycle_start = None
+        self.cycle = []
+
+    def observe(self, generation, grid):
+        """Record a generation; returns True when this completes a cycle"""
+        if self.period is not None:
+            return False
+        if self.last_generation is not None and generation != self.last_generation + 1:
+            self.reset()
+
+        grid = np.ascontiguousarray(grid, dtype=np.uint8)
+        self.shape = grid.shape
+        self.last_generation = generation
+        digest = hashlib.blake2b(grid, digest_size=16).digest()
+        packed = np.packbits(grid)
+
+        earlier = self.seen.get(digest)
+        if earlier is not None and np.array_equal(self.snapshots[earlier], packed):
+            self.period = generation - earlier
+            self.cycle_start = earlier
+            self.cycle = [self.snapshots[g] for g in range(earlier, generation)]
+            return True
+
+        self.seen[digest] = generation
+        self.order.append((digest, generation))
+        self.snapshots[generation] = packed
+        if len(self.order) > self.history:
+            oldest, oldest_generation = self.order.popleft()
+            del self.snapshots[oldest_generation]
+            if self.seen.get(oldest) == oldest_generation:
+                del self.seen[oldest]
+        return False
+
+    def state_at(self, generation):
+        """Board at any generation from cycle_start on, once a cycle is known"""
+        packed = self.cycle[(generation - self.cycle_start) % self.period]
+        size = self.shape[0] * self.shape[1]
+        return np.unpackbits(packed, count=size).reshape(self.shape)
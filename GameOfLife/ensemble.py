@@ -0,0 +1,167 @@
+import multiprocessing
+
+import numpy as np
+
+from life_engine import apply_rule, padded_index
+from rules import parse_rule
+
+
+# Largest number of boards stepped together in one array
+MAX_BATCH = 512
+
+# Memory a batch may spend on its boards' bit-packed cycle history
+MAX_BATCH_BYTES = 256 << 20
+
+# Random odd multipliers for hashing bit-packed boards, fixed so hashes are
+# the same in every process
+_HASH_WEIGHTS = np.random.default_rng(0x5EED).integers(1, 1 << 63, size=1 << 16, dtype=np.uint64) | np.uint64(1)
+
+
+class Ensemble:
+    """A batch of independent boards stepped together as one 3-D array
+
+    Boards live in cells with shape (boards, height, width). run steps them
+    all at once and drops each board from the batch as soon as it dies out
+    or repeats one of its last cycle_history generations, so the cost
+    follows the boards that are still evolving.
+    """
+
+    def __init__(self, cells, wrap=False, rule="B3/S23", cycle_history=64):
+        self.cells = (np.asarray(cells) != 0).astype(np.uint8)
+        self.wrap = wrap
+        self.rule = parse_rule(rule)
+        self.cycle_history = cycle_history
+
+    @classmethod
+    def random(cls, seeds, width, height, density=0.3, **kwargs):
+        """One board per seed, filled like LifeSimulation.randomize
+
+        seeds are anything np.random.default_rng accepts, e.g. the children
+        of a SeedSequence, so each board is the same however the ensemble is
+        split up.
+        """
+        cells = np.empty((len(seeds), height, width), dtype=np.uint8)
+        for i, seed in enumerate(seeds):
+            cells[i] = np.random.default_rng(seed).random((height, width)) < density
+        return cls(cells, **kwargs)
+
+    @property
+    def boards(self):
+        return self.cells.shape[0]
+
+    def step(self, cells):
+        padded = np.pad(cells, ((0, 0), (1, 1), (1, 1)), mode='wrap' if self.wrap else 'constant')
+        return apply_rule(padded_index(padded), self.rule).view(np.uint8)
+
+    def hash(self, packed):
+        """64-bit hash of each bit-packed board"""
+        size = packed.shape[1]
+        weights = _HASH_WEIGHTS[:size] if size <= len(_HASH_WEIGHTS) else np.resize(_HASH_WEIGHTS, size)
+        return (packed.astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+
+    def run(self, generations):
+        """Step every board up to generations times
+
+        Returns a dict of per-board arrays:
+            populations      (boards, generations + 1) population curves,
+                             -1 after the board was finished
+            finished         generation the board stopped being stepped
+            stabilized       generation the board died out or first reached
+                             the state its cycle repeats, -1 if it never did
+            period           cycle period, 0 if none was found (or it died)
+            died             True if the population reached zero
+            final_population population at the finished generation
+        """
+        total = self.boards
+        populations = np.full((total, generations + 1), -1, dtype=np.int32)
+        finished = np.full(total, generations, dtype=np.int32)
+        stabilized = np.full(total, -1, dtype=np.int32)
+        period = np.zeros(total, dtype=np.int32)
+        died = np.zeros(total, dtype=bool)
+
+        cells = self.cells
+        ids = np.arange(total)
+        history = max(1, self.cycle_history)
+        width_bytes = (cells.shape[2] + 7) // 8 * cells.shape[1]
+        seen_hash = np.zeros((history, total), dtype=np.uint64)
+        seen_packed = np.zeros((history, total, width_bytes), dtype=np.uint8)
+        seen_generation = np.full(history, -1, dtype=np.int64)
+
+        for generation in range(generations + 1):
+            if generation:
+                cells = self.step(cells)
+            population = np.count_nonzero(cells.reshape(len(ids), -1), axis=1)
+            populations[ids, generation] = population
+            done = population == 0
+            died[ids[done]] = True
+            stabilized[ids[done]] = generation
+
+            packed = np.packbits(cells, axis=2).reshape(len(ids), -1)
+            hashes = self.hash(packed)
+            if self.cycle_history:
+                valid = seen_generation >= 0
+                for row in np.flatnonzero(((seen_hash == hashes) & valid[:, None]).any(axis=0) & ~done):
+                    slots = np.flatnonzero(valid & (seen_hash[:, row] == hashes[row]))
+                    # Most recent matching generation first, so the period is the smallest one
+                    for slot in slots[np.argsort(-seen_generation[slots])]:
+                        if np.array_equal(seen_packed[slot, row], packed[row]):
+                            board = ids[row]
+                            stabilized[board] = seen_generation[slot]
+                            period[board] = generation - seen_generation[slot]
+                            done[row] = True
+                            break
+
+            finished[ids[done]] = generation
+            if done.all() or generation == generations:
+                break
+            slot = generation % history
+            seen_hash[slot] = hashes
+            seen_packed[slot] = packed
+            seen_generation[slot] = generation
+            if done.any():
+                keep = ~done
+                cells, ids, packed = cells[keep], ids[keep], packed[keep]
+                seen_hash = seen_hash[:, keep]
+                seen_packed = seen_packed[:, keep]
+
+        final_population = populations[np.arange(total), finished]
+        return {
+            'populations': populations,
+            'finished': finished,
+            'stabilized': stabilized,
+            'period': period,
+            'died': died,
+            'final_population': final_population,
+        }
+
+
+def run_batch(seeds, width, height, generations, density, wrap, rule, cycle_history):
+    ensemble = Ensemble.random(seeds, width, height, density, wrap=wrap, rule=rule, cycle_history=cycle_history)
+    return ensemble.run(generations)
+
+
+def batch_size(width, height, cycle_history):
+    """Boards per batch: MAX_BATCH, or fewer if their cycle history would pass MAX_BATCH_BYTES"""
+    board_bytes = max(1, cycle_history) * height * ((width + 7) // 8)
+    return max(1, min(MAX_BATCH, MAX_BATCH_BYTES // board_bytes))
+
+
+def run_ensemble(boards, width=50, height=40, generations=1000, density=0.3, wrap=False, rule="B3/S23",
+                 seed=None, cycle_history=64, workers=1):
+    """Run a seeded ensemble of random boards, in batches split across worker processes
+
+    Board i is seeded with child i of SeedSequence(seed), so the results are
+    the same for any number of workers. Returns the dict described in
+    Ensemble.run, with the batches joined back together in board order.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(boards)
+    batches = max(workers, -(-boards // batch_size(width, height, cycle_history)))
+    bounds = np.linspace(0, boards, batches + 1).astype(int)
+    jobs = [(seeds[start:end], width, height, generations, density, wrap, str(parse_rule(rule)), cycle_history)
+            for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+    if workers <= 1:
+        parts = [run_batch(*job) for job in jobs]
+    else:
+        with multiprocessing.get_context().Pool(workers) as pool:
+            parts = pool.starmap(run_batch, jobs)
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
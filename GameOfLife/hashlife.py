@@ -0,0 +1,344 @@
+import numpy as np
+
+from rules import CONWAY
+
+
+class Node:
+    """Immutable quadtree node; level 0 nodes are single cells"""
+    __slots__ = ('nw', 'ne', 'sw', 'se', 'level', 'population')
+
+    def __init__(self, nw, ne, sw, se, level, population):
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.level = level
+        self.population = population
+
+
+def build_base_table(rule=CONWAY):
+    """Next state of the centre 2x2 of every 4x4 block, as 4-bit masks
+
+    Block bit y * 4 + x holds cell (x, y); result bit y * 2 + x holds centre
+    cell (x + 1, y + 1).
+    """
+    blocks = np.arange(1 << 16)
+    cells = ((blocks[:, None] >> np.arange(16)) & 1).reshape(-1, 4, 4)
+    table = np.zeros(1 << 16, dtype=np.uint8)
+    for cy in (1, 2):
+        for cx in (1, 2):
+            counts = cells[:, cy - 1:cy + 2, cx - 1:cx + 2].sum(axis=(1, 2)) - cells[:, cy, cx]
+            alive = rule.table[counts * 2 + cells[:, cy, cx]]
+            table |= alive << ((cy - 1) * 2 + (cx - 1))
+    return table.tolist()
+
+
+class HashLife:
+    """Unbounded Life universe stored as a hash-consed quadtree
+
+    Identical subtrees are shared and the result of advancing each node is
+    memoized, so repetitive patterns can be jumped 2^k generations in one
+    call. The universe grows on demand; width and height only describe the
+    window at (0, 0) returned by to_array for drawing. Rules with births on
+    0 neighbors are rejected, since empty space must stay empty.
+
+    The node table and memo are bounded by max_nodes. When a jump starts
+    with more entries than that, everything not reachable from the current
+    root is dropped and the memo is cleared.
+    """
+
+    bounded = False  # the window returned by to_array is not the whole state
+
+    def __init__(self, width, height, wrap=False, max_nodes=1000000, rule=CONWAY):
+        if 0 in rule.birth:
+            raise ValueError(f"HashLife cannot run {rule}: births on 0 neighbors fill empty space")
+        self.width = width
+        self.height = height
+        self.wrap = wrap  # ignored, the universe has no edges
+        self.max_nodes = max_nodes
+        self.generation = 0
+
+        self.off = Node(None, None, None, None, 0, 0)
+        self.on = Node(None, None, None, None, 0, 1)
+        self.nodes = {}
+        self.memo = {}
+        self.empties = [self.off]
+        self.rule = rule
+        self.base_table = build_base_table(rule)
+        self.root = self.empty(3)
+
+    @property
+    def population(self):
+        return self.root.population
+
+    def join(self, nw, ne, sw, se):
+        """Return the canonical node with the given quadrants"""
+        key = (nw, ne, sw, se)
+        node = self.nodes.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = Node(nw, ne, sw, se, nw.level + 1, population)
+            self.nodes[key] = node
+        return node
+
+    def empty(self, level):
+        while len(self.empties) <= level:
+            e = self.empties[-1]
+            self.empties.append(self.join(e, e, e, e))
+        return self.empties[level]
+
+    def expand(self, node):
+        """Wrap node in a border of empty space, keeping it centred"""
+        e = self.empty(node.level - 1)
+        return self.join(
+            self.join(e, e, e, node.nw),
+            self.join(e, e, node.ne, e),
+            self.join(e, node.sw, e, e),
+            self.join(node.se, e, e, e),
+        )
+
+    def is_padded(self, node):
+        """True if every live cell sits in the centre quarter of node"""
+        if node.level < 3:
+            return False
+        centre = (node.nw.se.se.population + node.ne.sw.sw.population +
+                  node.sw.ne.ne.population + node.se.nw.nw.population)
+        return centre == node.population
+
+    def base_step(self, node):
+        """Advance a 4x4 node one generation, returning its centre 2x2"""
+        bits = 0
+        for quad, shift in ((node.nw, 0), (node.ne, 2), (node.sw, 8), (node.se, 10)):
+            bits |= (quad.nw.population << shift | quad.ne.population << (shift + 1) |
+                     quad.sw.population << (shift + 4) | quad.se.population << (shift + 5))
+        result = self.base_table[bits]
+        cells = [self.on if result >> i & 1 else self.off for i in range(4)]
+        return self.join(*cells)
+
+    def successor(self, node, j):
+        """Centre half of node advanced by 2^j generations, j <= level - 2"""
+        j = min(j, node.level - 2)
+        key = (node, j)
+        result = self.memo.get(key)
+        if result is not None:
+            return result
+
+        if node.population == 0:
+            result = node.nw
+        elif node.level == 2:
+            result = self.base_step(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            join = self.join
+            c1 = self.successor(nw, j)
+            c2 = self.successor(join(nw.ne, ne.nw, nw.se, ne.sw), j)
+            c3 = self.successor(ne, j)
+            c4 = self.successor(join(nw.sw, nw.se, sw.nw, sw.ne), j)
+            c5 = self.successor(join(nw.se, ne.sw, sw.ne, se.nw), j)
+            c6 = self.successor(join(ne.sw, ne.se, se.nw, se.ne), j)
+            c7 = self.successor(sw, j)
+            c8 = self.successor(join(sw.ne, se.nw, sw.se, se.sw), j)
+            c9 = self.successor(se, j)
+
+            if j < node.level - 2:
+                # The first round already covered 2^j generations
+                result = join(
+                    join(c1.se, c2.sw, c4.ne, c5.nw),
+                    join(c2.se, c3.sw, c5.ne, c6.nw),
+                    join(c4.se, c5.sw, c7.ne, c8.nw),
+                    join(c5.se, c6.sw, c8.ne, c9.nw),
+                )
+            else:
+                result = join(
+                    self.successor(join(c1, c2, c4, c5), j),
+                    self.successor(join(c2, c3, c5, c6), j),
+                    self.successor(join(c4, c5, c7, c8), j),
+                    self.successor(join(c5, c6, c8, c9), j),
+                )
+
+        self.memo[key] = result
+        return result
+
+    def advance_pow2(self, k):
+        """Advance the universe by 2^k generations in a single jump"""
+        if len(self.nodes) + len(self.memo) > self.max_nodes:
+            self.collect()
+
+        root = self.root
+        while root.level < k + 3 or not self.is_padded(root):
+            root = self.expand(root)
+        self.root = self.successor(root, k)
+        self.generation += 1 << k
+
+    def advance(self, n):
+        """Advance the universe by n generations, one jump per set bit of n"""
+        k = 0
+        while n:
+            if n & 1:
+                self.advance_pow2(k)
+            n >>= 1
+            k += 1
+
+    def step(self):
+        """Perform one generation step"""
+        self.advance_pow2(0)
+
+    def collect(self):
+        """Drop every node not reachable from the root and clear the memo"""
+        live = {}
+        stack = [self.root] + self.empties
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key in live:
+                continue
+            live[key] = node
+            stack.extend(key)
+        self.nodes = live
+        self.memo = {}
+
+    def contains(self, x, y):
+        half = 1 << (self.root.level - 1)
+        return -half <= x < half and -half <= y < half
+
+    def set_cell(self, x, y, alive):
+        while not self.contains(x, y):
+            self.root = self.expand(self.root)
+        half = 1 << (self.root.level - 1)
+        self.root = self.set_in(self.root, x + half, y + half, alive)
+
+    def set_in(self, node, x, y, alive):
+        """Copy of node with the cell at offset (x, y) set"""
+        if node.level == 0:
+            return self.on if alive else self.off
+        half = 1 << (node.level - 1)
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        if y < half:
+            if x < half:
+                nw = self.set_in(nw, x, y, alive)
+            else:
+                ne = self.set_in(ne, x - half, y, alive)
+        elif x < half:
+            sw = self.set_in(sw, x, y - half, alive)
+        else:
+            se = self.set_in(se, x - half, y - half, alive)
+        return self.join(nw, ne, sw, se)
+
+    def get_cell(self, x, y):
+        if not self.contains(x, y):
+            return 0
+        node = self.root
+        half = 1 << (node.level - 1)
+        x += half
+        y += half
+        while node.level > 0:
+            half = 1 << (node.level - 1)
+            if y < half:
+                node = node.nw if x < half else node.ne
+            else:
+                node = node.sw if x < half else node.se
+            x %= half
+            y %= half
+        return node.population
+
+    def toggle_cell(self, x, y):
+        """Flip a single cell and return its new state"""
+        alive = 1 - self.get_cell(x, y)
+        self.set_cell(x, y, alive)
+        return alive
+
+    def clear(self):
+        self.root = self.empty(3)
+        self.generation = 0
+
+    def randomize(self, density=0.3):
+        """Fill the view window with live cells at the given density"""
+        self.load_array(np.random.random((self.height, self.width)) < density)
+
+    def load_array(self, array, x0=0, y0=0):
+        """Replace the universe with a dense array placed at (x0, y0)"""
+        array = np.asarray(array) != 0
+        height, width = array.shape
+        level = 3
+        while (1 << (level - 1)) < max(abs(x0), abs(y0)) + max(width, height):
+            level += 1
+        half = 1 << (level - 1)
+        self.root = self.from_array(array, x0 + half, y0 + half, level)
+        self.generation = 0
+
+    def from_array(self, array, x0, y0, level):
+        """Node of the given level with array[0, 0] at offset (x0, y0) inside it"""
+        size = 1 << level
+        height, width = array.shape
+        left, top = max(0, -x0), max(0, -y0)
+        right, bottom = min(width, size - x0), min(height, size - y0)
+        if left >= right or top >= bottom or not array[top:bottom, left:right].any():
+            return self.empty(level)
+        if level == 0:
+            return self.on
+        half = size >> 1
+        return self.join(
+            self.from_array(array, x0, y0, level - 1),
+            self.from_array(array, x0 - half, y0, level - 1),
+            self.from_array(array, x0, y0 - half, level - 1),
+            self.from_array(array, x0 - half, y0 - half, level - 1),
+        )
+
+    def to_array(self, x0=0, y0=0, width=None, height=None):
+        """Dense uint8 copy of the window with top-left corner (x0, y0)"""
+        width = self.width if width is None else width
+        height = self.height if height is None else height
+        out = np.zeros((height, width), dtype=np.uint8)
+        half = 1 << (self.root.level - 1)
+        self.paint(self.root, -half - x0, -half - y0, out)
+        return out
+
+    def window(self, x0, y0, x1, y1):
+        """Cells of the rectangle [x0, x1) x [y0, y1), anywhere in the universe"""
+        return self.to_array(x0, y0, x1 - x0, y1 - y0)
+
+    def block_sums(self, x0, y0, x1, y1, level):
+        """Live cells in each 2^level x 2^level block of [x0, x1) x [y0, y1)
+
+        x0 and y0 must be multiples of 2^level. Read off node populations,
+        so the cost follows the number of blocks rather than cells.
+        """
+        size = 1 << level
+        out = np.zeros(((y1 - y0 + size - 1) >> level, (x1 - x0 + size - 1) >> level), dtype=np.int64)
+        half = 1 << (self.root.level - 1)
+        self.add_blocks(self.root, -half - x0, -half - y0, level, out)
+        return out
+
+    def add_blocks(self, node, x, y, level, out):
+        """Add the population of node, whose corner is at cell (x, y) of out's window, to out's blocks"""
+        size = 1 << node.level
+        height, width = out.shape
+        if (node.population == 0 or x >= width << level or y >= height << level
+                or x + size <= 0 or y + size <= 0):
+            return
+        # Below the root every node is aligned to its size, so one no larger than a block lies in one block
+        if node.level <= level and node is not self.root:
+            out[y >> level, x >> level] += node.population
+            return
+        half = size >> 1
+        self.add_blocks(node.nw, x, y, level, out)
+        self.add_blocks(node.ne, x + half, y, level, out)
+        self.add_blocks(node.sw, x, y + half, level, out)
+        self.add_blocks(node.se, x + half, y + half, level, out)
+
+    def paint(self, node, x, y, out):
+        """Write the live cells of node, whose corner is at (x, y) in out"""
+        size = 1 << node.level
+        height, width = out.shape
+        if node.population == 0 or x >= width or y >= height or x + size <= 0 or y + size <= 0:
+            return
+        if node.level == 0:
+            out[y, x] = 1
+            return
+        half = size >> 1
+        self.paint(node.nw, x, y, out)
+        self.paint(node.ne, x + half, y, out)
+        self.paint(node.sw, x, y + half, out)
+        self.paint(node.se, x + half, y + half, out)
@@ -0,0 +1,153 @@
+import mmap
+import zlib
+from bisect import bisect_right
+
+import numpy as np
+
+
+class HistoryRecorder:
+    """Compressed record of past generations with random-access seek
+
+    Every keyframe_interval generations the full board is stored; the
+    generations in between are stored as the XOR against the previous
+    generation. Both are bit-packed and zlib-compressed. Seeking decodes
+    from the nearest keyframe at or before the target.
+
+    Once the in-memory data exceeds memory_budget bytes, the oldest entries
+    are moved to spill_path (read back through a memory map) if one is
+    given, and otherwise whole keyframe segments are dropped from the front.
+    Recording a generation at or before the latest one discards everything
+    after it, so history branches when the past is edited.
+    """
+
+    def __init__(self, keyframe_interval=64, memory_budget=32 << 20, spill_path=None):
+        self.keyframe_interval = keyframe_interval
+        self.memory_budget = memory_budget
+        self.spill_path = spill_path
+        self.spill_file = None
+        self.spill_map = None
+        self.reset()
+
+    def reset(self):
+        self.entries = []
+        self.generations = []
+        self.shape = None
+        self.previous = None
+        self.last_keyframe = None
+        self.memory = 0
+        self.spilled = 0  # index of the first entry still held in memory
+
+    @property
+    def first_generation(self):
+        return self.generations[0] if self.generations else None
+
+    @property
+    def last_generation(self):
+        return self.generations[-1] if self.generations else None
+
+    def __contains__(self, generation):
+        i = bisect_right(self.generations, generation) - 1
+        return i >= 0 and self.generations[i] == generation
+
+    def record(self, generation, grid):
+        """Store a generation, as a keyframe or a delta from the one before"""
+        grid = np.asarray(grid, dtype=np.uint8)
+        if grid.shape != self.shape:
+            self.reset()
+            self.shape = grid.shape
+        if self.generations and generation <= self.generations[-1]:
+            self.truncate(generation)
+
+        packed = np.packbits(grid)
+        contiguous = self.previous is not None and self.generations[-1] == generation - 1
+        keyframe = not contiguous or generation - self.last_keyframe >= self.keyframe_interval
+        data = zlib.compress((packed if keyframe else packed ^ self.previous).tobytes(), 1)
+
+        self.entries.append({'generation': generation, 'keyframe': keyframe, 'data': data, 'offset': 0, 'size': len(data)})
+        self.generations.append(generation)
+        self.memory += len(data)
+        self.previous = packed
+        if keyframe:
+            self.last_keyframe = generation
+        self.enforce_budget()
+
+    def truncate(self, generation):
+        """Forget generation and everything recorded after it"""
+        i = bisect_right(self.generations, generation - 1)
+        for entry in self.entries[i:]:
+            if entry['data'] is not None:
+                self.memory -= entry['size']
+        del self.entries[i:]
+        del self.generations[i:]
+        self.spilled = min(self.spilled, i)
+
+        self.previous = self.decode(i - 1) if i > 0 else None
+        self.last_keyframe = None
+        for entry in reversed(self.entries):
+            if entry['keyframe']:
+                self.last_keyframe = entry['generation']
+                break
+
+    def enforce_budget(self):
+        while self.memory > self.memory_budget and self.spilled < len(self.entries) - 1:
+            if self.spill_path is not None:
+                self.spill(self.entries[self.spilled])
+                self.spilled += 1
+                continue
+
+            # Drop the oldest keyframe segment, as long as another one follows
+            end = next((i for i in range(1, len(self.entries)) if self.entries[i]['keyframe']), None)
+            if end is None:
+                break
+            for entry in self.entries[:end]:
+                self.memory -= entry['size']
+            del self.entries[:end]
+            del self.generations[:end]
+
+    def spill(self, entry):
+        """Move an entry's data to the end of the spill file"""
+        if self.spill_file is None:
+            self.spill_file = open(self.spill_path, 'w+b')
+        self.spill_file.seek(0, 2)
+        entry['offset'] = self.spill_file.tell()
+        self.spill_file.write(entry['data'])
+        self.memory -= entry['size']
+        entry['data'] = None
+
+    def read(self, entry):
+        if entry['data'] is not None:
+            return entry['data']
+        end = entry['offset'] + entry['size']
+        if self.spill_map is None or len(self.spill_map) < end:
+            self.spill_file.flush()
+            if self.spill_map is not None:
+                self.spill_map.close()
+            self.spill_map = mmap.mmap(self.spill_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.spill_map[entry['offset']:end]
+
+    def decode(self, index):
+        """Bit-packed board of the entry at index"""
+        start = index
+        while not self.entries[start]['keyframe']:
+            start -= 1
+        packed = np.frombuffer(zlib.decompress(self.read(self.entries[start])), dtype=np.uint8).copy()
+        for entry in self.entries[start + 1:index + 1]:
+            packed ^= np.frombuffer(zlib.decompress(self.read(entry)), dtype=np.uint8)
+        return packed
+
+    def seek(self, generation):
+        """Board at a recorded generation"""
+        i = bisect_right(self.generations, generation) - 1
+        if i < 0 or self.generations[i] != generation:
+            raise KeyError(f"generation {generation} is not recorded")
+        size = self.shape[0] * self.shape[1]
+        return np.unpackbits(self.decode(i), count=size).reshape(self.shape)
+
+    def close(self):
+        """Release the spill file"""
+        if self.spill_map is not None:
+            self.spill_map.close()
+            self.spill_map = None
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
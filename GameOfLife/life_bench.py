@@ -0,0 +1,220 @@
+"""Benchmark Game of Life stepping and rendering
+
+    python life_bench.py                                   # default sweep
+    python life_bench.py --sizes 50x40,2000x2000 --backends Dense,Packed
+    python life_bench.py --large --output results.json
+    python life_bench.py --rule "Day & Night" --output daynight.json
+    python life_bench.py --output new.json --compare old.json
+
+Every case starts from a seeded random grid, so runs on different commits
+measure the same boards. Results are written as JSON.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+from life_core import BACKENDS, LifeSimulation
+from rules import parse_rule
+
+
+DEFAULT_SIZES = [(50, 40), (200, 150), (1000, 1000), (4000, 4000)]
+LARGE_SIZES = [(16000, 16000)]
+DEFAULT_DENSITIES = [0.1, 0.3, 0.5]
+
+# Roughly this many cell updates per timed case, within the limits below
+CELL_BUDGET = 2 * 10 ** 8
+MIN_GENERATIONS = 3
+MAX_GENERATIONS = 500
+MEMORY_GENERATIONS = 2
+RENDER_FRAMES = 30
+
+
+def parse_size(text):
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Game of Life benchmark suite")
+    parser.add_argument('--sizes', help="comma-separated WxH grid sizes (default: 50x40 up to 4000x4000)")
+    parser.add_argument('--large', action='store_true', help="also run 16000x16000 grids")
+    parser.add_argument('--densities', default=','.join(map(str, DEFAULT_DENSITIES)), help="comma-separated live cell densities")
+    parser.add_argument('--backends', default="Dense,Packed,Tiled", help="comma-separated backends to measure")
+    parser.add_argument('--edges', default="dead,wrap", help="boundary modes to measure: dead, wrap or both")
+    parser.add_argument('--rule', default="B3/S23", help="B/S rule or rule name to step")
+    parser.add_argument('--generations', type=int, default=None, help="generations per case (default: scaled to grid size)")
+    parser.add_argument('--seed', type=int, default=12345, help="seed for the random grids")
+    parser.add_argument('--no-render', action='store_true', help="skip the offscreen rendering benchmark")
+    parser.add_argument('--output', default="life_bench.json", help="where to write the JSON results")
+    parser.add_argument('--compare', help="earlier results file to compare generations/sec against")
+    return parser.parse_args(argv)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def make_simulation(backend, width, height, density, wrap, seed, rule="B3/S23"):
+    np.random.seed(seed)
+    sim = LifeSimulation(width, height, backend, wrap, rule=rule)
+    sim.randomize(density)
+    return sim
+
+
+def time_stepping(case, generations, seed):
+    sim = make_simulation(case['backend'], case['width'], case['height'], case['density'], case['wrap'], seed,
+                          case['rule'])
+    try:
+        sim.step()  # warm-up: worker start-up, first allocations
+        start = time.perf_counter()
+        for _ in range(generations):
+            sim.step()
+        return time.perf_counter() - start, sim.population
+    finally:
+        sim.close()
+
+
+def peak_memory(case, seed):
+    """Peak bytes allocated while building the grid and stepping it"""
+    tracemalloc.start()
+    try:
+        sim = make_simulation(case['backend'], case['width'], case['height'], case['density'], case['wrap'], seed,
+                              case['rule'])
+        try:
+            for _ in range(MEMORY_GENERATIONS):
+                sim.step()
+        finally:
+            sim.close()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def render_time(width, height, density, seed):
+    """Milliseconds per frame to draw a changing grid offscreen, zoomed to fit the window"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    try:
+        import pygame
+        from camera import Camera
+        from renderer import GridRenderer
+    except ImportError:
+        return None
+
+    # Same window layout as GameOfLife.py: 1200x800 with a 120 px control panel
+    pygame.init()
+    target = pygame.Surface((1200, 800))
+    camera = Camera(pygame.Rect(0, 120, 1200, 680))
+    camera.fit(width, height)
+    renderer = GridRenderer((255, 255, 255), (20, 20, 20), (60, 60, 60))
+    sim = make_simulation("Dense", width, height, density, False, seed)
+    renderer.draw(target, sim.view(*camera.window()), camera)
+    elapsed = 0.0
+    for _ in range(RENDER_FRAMES):
+        sim.step()
+        start = time.perf_counter()
+        # What the simulation thread publishes plus what the window draws
+        renderer.draw(target, sim.view(*camera.window()), camera)
+        elapsed += time.perf_counter() - start
+    return elapsed / RENDER_FRAMES * 1000
+
+
+def run_case(case, generations, seed, render):
+    cells = case['width'] * case['height']
+    if generations is None:
+        generations = max(MIN_GENERATIONS, min(MAX_GENERATIONS, CELL_BUDGET // cells))
+    seconds, population = time_stepping(case, generations, seed)
+    result = dict(case)
+    result.update(
+        generations=generations,
+        seconds=seconds,
+        generations_per_sec=generations / seconds,
+        cells_per_sec=generations * cells / seconds,
+        final_population=population,
+        peak_memory_bytes=peak_memory(case, seed),
+        render_ms_per_frame=render_time(case['width'], case['height'], case['density'], seed) if render else None,
+    )
+    return result
+
+
+def case_key(result):
+    return (result['backend'], result['width'], result['height'], result['density'], result['wrap'],
+            result.get('rule', "B3/S23"))
+
+
+def print_comparison(results, path):
+    with open(path) as f:
+        baseline = {case_key(r): r for r in json.load(f)['results']}
+    print(f"\nCompared with {path}:")
+    for result in results:
+        old = baseline.get(case_key(result))
+        if old is not None:
+            ratio = result['generations_per_sec'] / old['generations_per_sec']
+            print(f"  {result['backend']:>8} {result['width']}x{result['height']} density {result['density']} "
+                  f"{'wrap' if result['wrap'] else 'dead'}: {ratio:.2f}x")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [parse_size(s) for s in args.sizes.split(',')] if args.sizes else list(DEFAULT_SIZES)
+    if args.large:
+        sizes += LARGE_SIZES
+    densities = [float(d) for d in args.densities.split(',')]
+    backends = args.backends.split(',')
+    for backend in backends:
+        if backend not in BACKENDS:
+            raise SystemExit(f"unknown backend {backend!r}, choose from {', '.join(BACKENDS)}")
+    edges = [edge == 'wrap' for edge in args.edges.split(',')]
+    rule = str(parse_rule(args.rule))
+
+    results = []
+    print(f"{'Backend':>8} {'Size':>12} {'Density':>7} {'Edges':>5} {'Gen/s':>10} {'Cells/s':>12} {'Peak MB':>8} {'Render ms':>9}")
+    for width, height in sizes:
+        for density in densities:
+            # Rendering doesn't depend on backend or edges, so time it once per board
+            rendered = False
+            for backend in backends:
+                for wrap in edges:
+                    case = {'backend': backend, 'width': width, 'height': height, 'density': density, 'wrap': wrap,
+                            'rule': rule}
+                    result = run_case(case, args.generations, args.seed, not (args.no_render or rendered))
+                    rendered = True
+                    results.append(result)
+                    render_ms = result['render_ms_per_frame']
+                    print(f"{backend:>8} {f'{width}x{height}':>12} {density:>7} {'wrap' if wrap else 'dead':>5} "
+                          f"{result['generations_per_sec']:>10.1f} {result['cells_per_sec']:>12.3g} "
+                          f"{result['peak_memory_bytes'] / 2 ** 20:>8.1f} "
+                          f"{'-' if render_ms is None else f'{render_ms:.2f}':>9}")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Run Game of Life simulations without a display
+
+    python life_cli.py --width 1000 --height 1000 --generations 500
+    python life_cli.py --load board.npy --backend Packed --generations 10000
+    python life_cli.py --width 4000 --height 4000 --generations 50 --scaling 1,2,4,8
+    python life_cli.py --load patterns/acorn.rle --width 400 --height 400 --generations 5206 --save acorn.snap
+    python life_cli.py --rule HighLife --width 500 --height 500 --generations 1000
+    python life_cli.py --ensemble 10000 --generations 5000 --seed 1 --workers 4
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from ensemble import run_ensemble
+from life_core import BACKENDS, LifeSimulation
+from parallel_grid import measure_scaling
+from patterns import PATTERN_EXTENSIONS, read_header, save_pattern
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Game of Life runner")
+    parser.add_argument('--width', type=int, default=None, help="grid width (default 50, or the loaded grid's width)")
+    parser.add_argument('--height', type=int, default=None, help="grid height (default 40, or the loaded grid's height)")
+    parser.add_argument('--generations', type=int, default=1000, help="number of generations to run")
+    parser.add_argument('--backend', choices=list(BACKENDS), default="Dense", help="grid storage backend")
+    parser.add_argument('--wrap', action='store_true', help="use toroidal edges instead of dead borders")
+    parser.add_argument('--rule', default=None, help="B/S rule or rule name, e.g. B36/S23 or HighLife (default: the pattern's rule, else B3/S23)")
+    parser.add_argument('--load', help="start from a pattern file (.rle, .cells, .snap) or a .npy array instead of a random grid")
+    parser.add_argument('--save', help="write the final grid to a .rle, .cells or .snap file")
+    parser.add_argument('--density', type=float, default=0.3, help="live cell density for random grids")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for reproducible grids")
+    parser.add_argument('--cycle-history', type=int, default=0, help="generations to remember for cycle detection (0 disables it)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes for the Parallel backend or --ensemble (default: all cores)")
+    parser.add_argument('--scaling', help="comma-separated worker counts; report Parallel backend scaling instead of a run")
+    parser.add_argument('--ensemble', type=int, default=0, metavar='BOARDS', help="run this many random boards together and report their statistics")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.scaling:
+        report_scaling(args)
+        return
+    if args.ensemble:
+        report_ensemble(args)
+        return
+    if args.seed is not None:
+        np.random.seed(args.seed)
+
+    initial = pattern = None
+    width, height = 50, 40
+    if args.load and args.load.lower().endswith(PATTERN_EXTENSIONS):
+        pattern = args.load
+        header = read_header(pattern)
+        width, height = header['width'], header['height']
+    elif args.load:
+        initial = np.load(args.load)
+        height, width = initial.shape
+    width = args.width or width
+    height = args.height or height
+
+    sim = LifeSimulation(width, height, args.backend, args.wrap, {"Parallel": {"workers": args.workers}}, args.cycle_history,
+                         rule=args.rule or "B3/S23")
+    try:
+        if initial is not None:
+            sim.load_array(initial)
+        elif pattern:
+            sim.load_pattern(pattern)
+            if args.rule:
+                sim.set_rule(args.rule)
+        else:
+            sim.randomize(args.density)
+
+        start = time.perf_counter()
+        sim.advance(args.generations)
+        elapsed = time.perf_counter() - start
+        if args.save:
+            save_pattern(sim.grid, args.save, rule=str(sim.rule), generation=sim.generation)
+    finally:
+        sim.close()
+
+    rate = args.generations / elapsed if elapsed > 0 else float('inf')
+    print(f"Generation: {sim.generation}  |  Population: {sim.population}  |  Rule: {sim.rule.label}")
+    if sim.period is not None:
+        print(f"Cycle: period {sim.period} starting at generation {sim.cycles.cycle_start}")
+    if getattr(sim.board, 'bounded', True):
+        print(f"Time: {elapsed:.3f} s  |  {rate:,.1f} generations/s  |  {rate * width * height:,.0f} cells/s")
+    else:
+        # An unbounded universe has no cell count, and jumps skip most generations anyway
+        print(f"Time: {elapsed:.3f} s  |  {rate:,.1f} generations/s")
+
+
+def report_ensemble(args):
+    """Print how a seeded ensemble of random boards ended up"""
+    width, height = args.width or 50, args.height or 40
+    start = time.perf_counter()
+    results = run_ensemble(args.ensemble, width, height, args.generations, args.density, args.wrap,
+                           args.rule or "B3/S23", args.seed, args.cycle_history or 64, args.workers or os.cpu_count() or 1)
+    elapsed = time.perf_counter() - start
+
+    boards = args.ensemble
+    died = results['died']
+    periodic = results['period'] > 0
+    settled = results['stabilized'] >= 0
+    print(f"{boards} boards of {width}x{height}, density {args.density}, up to {args.generations} generations")
+    print(f"Died out: {died.mean():.1%}  |  Periodic: {periodic.mean():.1%}  |  Still evolving: {1 - settled.mean():.1%}")
+    if settled.any():
+        print(f"Stabilization generation: mean {results['stabilized'][settled].mean():.1f}  |  "
+              f"median {np.median(results['stabilized'][settled]):.0f}  |  max {results['stabilized'].max()}")
+    if periodic.any():
+        periods, counts = np.unique(results['period'][periodic], return_counts=True)
+        print("Periods: " + ", ".join(f"{p}: {c}" for p, c in zip(periods, counts)))
+    print(f"Final population: mean {results['final_population'].mean():.1f}")
+    generations = int(results['finished'].sum())
+    print(f"Time: {elapsed:.3f} s  |  {generations / elapsed:,.0f} board-generations/s")
+
+
+def report_scaling(args):
+    """Print speedup and efficiency of the Parallel backend per worker count"""
+    width, height = args.width or 2000, args.height or 2000
+    worker_counts = [int(n) for n in args.scaling.split(',')]
+    results = measure_scaling(width, height, args.generations, worker_counts, args.density, args.seed or 0)
+    print(f"{width}x{height}, {args.generations} generations")
+    print(f"{'Workers':>8}  {'Time (s)':>9}  {'Speedup':>8}  {'Efficiency':>10}")
+    for result in results:
+        print(f"{result['workers']:>8}  {result['seconds']:>9.3f}  {result['speedup']:>8.2f}  {result['efficiency']:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import numpy as np
+
+from life_engine import DenseGrid
+from packed_grid import PackedGrid
+from hashlife import HashLife
+from tiled_grid import TiledGrid
+from parallel_grid import ParallelGrid
+from cycles import CycleDetector
+from patterns import load_pattern, read_header
+from rules import parse_rule
+
+
+# Grid storage backends, all exposing the same grid API
+BACKENDS = {
+    "Dense": DenseGrid,
+    "Packed": PackedGrid,
+    "HashLife": HashLife,
+    "Tiled": TiledGrid,
+    "Parallel": ParallelGrid,
+}
+
+
+def block_sums(cells, level):
+    """Live cells in each 2^level x 2^level block of a dense array, padding its edges with dead cells"""
+    size = 1 << level
+    height, width = cells.shape
+    sums = np.zeros((-(-height // size) * size, -(-width // size) * size), dtype=np.uint8)
+    sums[:height, :width] = cells
+    # Halve the resolution level times, in the smallest type that holds each count
+    for done in range(1, level + 1):
+        count = 4 ** done
+        sums = sums.astype(np.uint8 if count < 256 else np.uint16 if count < 65536 else np.uint32, copy=False)
+        sums = sums[0::2, 0::2] + sums[0::2, 1::2] + sums[1::2, 0::2] + sums[1::2, 1::2]
+    return sums
+
+
+class LifeSimulation:
+    """Game of Life state and stepping, independent of any display
+
+    options maps a backend name to extra keyword arguments for it, e.g.
+    {"Parallel": {"workers": 4}}. With cycle_history > 0 the last that many
+    generations are checked for repeats, and once the board is periodic
+    later generations are looked up instead of stepped. Given a
+    HistoryRecorder, every generation is recorded so seek can go back.
+    rule is a Rule or anything parse_rule accepts, e.g. "B36/S23".
+    """
+
+    def __init__(self, width=50, height=40, backend="Dense", wrap=False, options=None, cycle_history=0,
+                 history=None, rule="B3/S23"):
+        self.width = width
+        self.height = height
+        self.backend = backend
+        self.options = options or {}
+        self.rule = parse_rule(rule)
+        self.generation = 0
+        self.board = self.make_board(backend, wrap)
+        self.cycles = CycleDetector(cycle_history) if cycle_history else None
+        self.history = history
+        self.history_stale = True  # current cells not yet in the history
+        self._grid = None
+
+    @property
+    def grid(self):
+        """Dense uint8 view of the cells, rebuilt only after a change"""
+        if self._grid is None:
+            self._grid = self.board.to_array()
+        return self._grid
+
+    @property
+    def population(self):
+        return self.board.population
+
+    @property
+    def wrap(self):
+        return self.board.wrap
+
+    @wrap.setter
+    def wrap(self, wrap):
+        self.board.wrap = wrap
+        self.edited()
+
+    @property
+    def period(self):
+        """Cycle period once the board is known to repeat, else None"""
+        return self.cycles.period if self.cycles is not None else None
+
+    def changed(self):
+        self._grid = None
+
+    def edited(self):
+        """The cells were changed by hand, so earlier history no longer applies"""
+        self.changed()
+        self.history_stale = True
+        if self.cycles is not None:
+            self.cycles.reset()
+
+    def set_history(self, history):
+        """Start recording into a HistoryRecorder, or stop with None"""
+        if self.history is not None:
+            self.history.close()
+        self.history = history
+        self.history_stale = True
+
+    def set_cycle_history(self, cycle_history):
+        """Start watching the last cycle_history generations for repeats, or stop with 0"""
+        self.cycles = CycleDetector(cycle_history) if cycle_history else None
+
+    def make_board(self, backend, wrap, rule=None):
+        return BACKENDS[backend](self.width, self.height, wrap, rule=rule or self.rule,
+                                 **self.options.get(backend, {}))
+
+    def replace_board(self, board):
+        """Swap in a new backend, shutting down the old one if it needs it"""
+        if hasattr(self.board, 'close'):
+            self.board.close()
+        self.board = board
+        self.edited()
+
+    def close(self):
+        if hasattr(self.board, 'close'):
+            self.board.close()
+        if self.history is not None:
+            self.history.close()
+
+    def resize(self, width, height):
+        """Start over with an empty grid of the given size"""
+        self.width = width
+        self.height = height
+        self.replace_board(self.make_board(self.backend, self.board.wrap))
+        self.generation = 0
+
+    def set_backend(self, backend):
+        """Switch grid backend, keeping the current cells"""
+        board = self.make_board(backend, self.board.wrap)
+        board.load_array(self.grid)
+        self.backend = backend
+        self.replace_board(board)
+
+    def set_rule(self, rule):
+        """Switch to another B/S rule, keeping the current cells"""
+        rule = parse_rule(rule)
+        board = self.make_board(self.backend, self.board.wrap, rule)
+        board.load_array(self.grid)
+        self.rule = rule
+        self.replace_board(board)
+
+    def load_array(self, array):
+        """Place a dense array at the top-left corner of an empty grid"""
+        array = np.asarray(array)
+        cells = np.zeros((self.height, self.width), dtype=np.uint8)
+        height = min(self.height, array.shape[0])
+        width = min(self.width, array.shape[1])
+        cells[:height, :width] = array[:height, :width] != 0
+        self.board.load_array(cells)
+        self.generation = 0
+        self.edited()
+
+    def load_pattern(self, path):
+        """Load a pattern file into the middle of an empty grid, under its own rule"""
+        header = read_header(path)
+        if parse_rule(header['rule']) != self.rule:
+            self.set_rule(header['rule'])
+        cells = np.zeros((self.height, self.width), dtype=np.uint8)
+        x0 = (self.width - header['width']) // 2
+        y0 = (self.height - header['height']) // 2
+        self.load_array(load_pattern(path, cells, x0, y0))
+
+    def clear(self):
+        self.board.clear()
+        self.generation = 0
+        self.edited()
+
+    def randomize(self, density=0.3):
+        self.board.randomize(density)
+        self.generation = 0
+        self.edited()
+
+    def toggle_cell(self, x, y):
+        self.board.toggle_cell(x, y)
+        self.edited()
+
+    def contains(self, x, y):
+        """True if (x, y) is a cell of the board; every cell is on an unbounded one"""
+        return not getattr(self.board, 'bounded', True) or (0 <= x < self.width and 0 <= y < self.height)
+
+    def view(self, x0, y0, x1, y1, level=0):
+        """What the display needs of the rectangle [x0, x1) x [y0, y1), as a dict
+
+        cells holds the live cells of the rectangle, or with level > 0 the
+        live count of each 2^level x 2^level block of it; x0 and y0 must be
+        multiples of 2^level. On a bounded board the rectangle is first
+        clipped to the board, and origin is its clipped top-left corner.
+        Only the rectangle is read, so the cost follows the view, not the board.
+        """
+        if getattr(self.board, 'bounded', True):
+            x0, y0 = max(0, x0), max(0, y0)
+            x1, y1 = max(x0, min(self.width, x1)), max(y0, min(self.height, y1))
+        if level and hasattr(self.board, 'block_sums'):
+            cells = self.board.block_sums(x0, y0, x1, y1, level)
+        elif level:
+            cells = block_sums(self.board.window(x0, y0, x1, y1), level)
+        else:
+            cells = np.array(self.board.window(x0, y0, x1, y1), dtype=np.uint8)
+        return {'origin': (x0, y0), 'level': level, 'cells': cells}
+
+    def detecting_cycles(self):
+        return self.cycles is not None and getattr(self.board, 'bounded', True)
+
+    def recording(self):
+        return self.history is not None and getattr(self.board, 'bounded', True)
+
+    def record_history(self):
+        """Add the current generation to the history if it isn't there yet"""
+        if self.recording() and (self.history_stale or self.generation not in self.history):
+            self.history.record(self.generation, self.grid)
+            self.history_stale = False
+
+    def seek(self, generation):
+        """Go back (or forward) to a recorded generation"""
+        self.record_history()
+        self.board.load_array(self.history.seek(generation))
+        self.generation = generation
+        self.changed()
+        if self.cycles is not None:
+            self.cycles.reset()
+
+    def observe(self):
+        """Feed the current generation to the cycle detector"""
+        if self.detecting_cycles() and self.cycles.last_generation != self.generation:
+            self.cycles.observe(self.generation, self.grid)
+
+    def jump_to(self, generation):
+        """Load a later generation of a board already known to be periodic"""
+        self.board.load_array(self.cycles.state_at(generation))
+        self.generation = generation
+        self.changed()
+
+    def step(self):
+        """Perform one generation step"""
+        self.record_history()
+        self.observe()
+        if self.period is not None:
+            self.jump_to(self.generation + 1)
+        else:
+            self.board.step()
+            self.generation += 1
+            self.changed()
+            self.observe()
+        self.record_history()
+
+    def advance(self, generations):
+        """Advance many generations in one call on backends that support it"""
+        if self.detecting_cycles():
+            target = self.generation + generations
+            while self.generation < target and self.period is None:
+                self.step()
+            if self.generation < target:
+                self.jump_to(target)
+            return
+
+        if self.recording():
+            for _ in range(generations):
+                self.step()
+            return
+
+        if hasattr(self.board, 'advance'):
+            self.board.advance(generations)
+        else:
+            for _ in range(generations):
+                self.board.step()
+        self.generation += generations
+        self.changed()
@@ -0,0 +1,146 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class SimulationRunner:
+    """Steps a LifeSimulation on a background thread
+
+    The thread holds lock for each generation it computes; anything else
+    that touches the simulation must hold it too, through hold(), which
+    makes the turbo loop stand aside instead of racing it for the lock. Every publish_interval
+    seconds (and whenever publish is called) a snapshot of what the display
+    needs is stored in latest, so drawing never waits for a step to finish.
+
+    Normally one generation is computed every interval seconds. In turbo
+    mode generations are computed back to back for turbo_budget seconds at a
+    time, then published, so each displayed frame advances as many
+    generations as fit in the budget. rate is the achieved generations/sec.
+    If profiler is set, the time of every generation is reported to it.
+
+    window is the (x0, y0, x1, y1, level) of the board the display shows,
+    from Camera.window; only that part is copied into latest.
+    """
+
+    RATE_WINDOW = 0.5  # seconds of stepping averaged into rate
+
+    def __init__(self, sim, interval=0.1, publish_interval=1 / 60, turbo_budget=1 / 60):
+        self.sim = sim
+        self.interval = interval
+        self.publish_interval = publish_interval
+        self.turbo_budget = turbo_budget
+        self.turbo = False
+        self.profiler = None
+        self.window = None
+        self.lock = threading.RLock()
+        self.waiting = 0  # callers queued in hold(); the turbo loop yields while any are
+        self.active = threading.Event()
+        self.stopping = False
+        self.rate = 0.0
+        self.rate_start = time.perf_counter()
+        self.rate_generation = sim.generation
+        self.latest = None
+        self.publish()
+        self.thread = threading.Thread(target=self.run, name="life-simulation", daemon=True)
+        self.thread.start()
+
+    @property
+    def running(self):
+        return self.active.is_set()
+
+    @contextmanager
+    def hold(self):
+        """Hold the lock, asking the stepping thread to let go of it first"""
+        self.waiting += 1
+        try:
+            with self.lock:
+                yield
+        finally:
+            self.waiting -= 1
+
+    def resume(self):
+        with self.hold():
+            self.rate_start = time.perf_counter()
+            self.rate_generation = self.sim.generation
+            self.active.set()
+
+    def pause(self):
+        with self.hold():
+            self.active.clear()
+            self.rate = 0.0
+            self.publish()
+
+    def stop(self):
+        """Finish the current generation and end the thread"""
+        self.stopping = True
+        self.active.set()
+        self.thread.join()
+
+    def publish(self):
+        """Snapshot the simulation for the display; call with the lock held or from the thread"""
+        sim = self.sim
+        board = sim.board
+        history = sim.history
+        window = self.window or (0, 0, sim.width, sim.height, 0)
+        self.latest = {
+            'generation': sim.generation,
+            'population': sim.population,
+            'view': sim.view(*window),
+            'backend': sim.backend,
+            'rule': str(sim.rule),
+            'tiles': (board.tiles_recomputed, board.tile_count) if hasattr(board, 'tiles_recomputed') else None,
+            'period': sim.period,
+            'cycle_start': sim.cycles.cycle_start if sim.cycles is not None else None,
+            'history': (history.first_generation, history.last_generation) if history is not None else (None, None),
+            'rate': self.rate,
+        }
+        self.published = time.perf_counter()
+
+    def measure_rate(self, now):
+        elapsed = now - self.rate_start
+        if elapsed >= self.RATE_WINDOW:
+            self.rate = (self.sim.generation - self.rate_generation) / elapsed
+            self.rate_start = now
+            self.rate_generation = self.sim.generation
+
+    def timed_step(self):
+        profiler = self.profiler  # may be swapped by the UI thread meanwhile
+        if profiler is None:
+            self.sim.step()
+            return
+        start = time.perf_counter()
+        self.sim.step()
+        profiler.add_step(time.perf_counter() - start)
+
+    def run(self):
+        due = time.perf_counter()
+        while True:
+            if not self.active.is_set():
+                self.active.wait()
+                due = time.perf_counter()
+            if self.stopping:
+                return
+
+            if self.turbo:
+                deadline = time.perf_counter() + self.turbo_budget
+                while time.perf_counter() < deadline and self.active.is_set():
+                    while self.waiting and not self.stopping:
+                        time.sleep(0)  # let the waiting caller take the lock
+                    with self.lock:
+                        self.timed_step()
+            else:
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(min(delay, self.publish_interval))
+                    continue
+                with self.lock:
+                    if self.active.is_set():
+                        self.timed_step()
+                # Don't build up a backlog when steps take longer than the interval
+                due = max(due + self.interval, time.perf_counter() - self.interval)
+
+            now = time.perf_counter()
+            self.measure_rate(now)
+            if self.turbo or now - self.published >= self.publish_interval:
+                with self.lock:
+                    self.publish()
@@ -0,0 +1,210 @@
+import numpy as np
+
+from rules import CONWAY
+
+
+WORD_BITS = 64
+
+_ONE = np.uint64(1)
+_TOP = np.uint64(WORD_BITS - 1)
+
+# Popcount for numpy versions without np.bitwise_count
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def low_match(values, bit0, bit1):
+    """Mask of cells whose count mod 4 is in values, None meaning all of them"""
+    values = frozenset(values)
+    if len(values) == 4:
+        return None
+    if values == {2, 3}:
+        return bit1.copy()
+    if values == {0, 1}:
+        return ~bit1
+    if values == {1, 3}:
+        return bit0.copy()
+    if values == {0, 2}:
+        return ~bit0
+    mask = np.zeros_like(bit0)
+    for value in values:
+        mask |= (bit0 if value & 1 else ~bit0) & (bit1 if value & 2 else ~bit1)
+    return mask
+
+
+def count_match(counts, bit0, bit1, bit2, bit3):
+    """Mask of cells whose neighbor count (as four bit planes) is in counts"""
+    # Counts 0-3 have bits 2 and 3 clear, 4-7 have bit 2 set, and 8 is the
+    # only count with bit 3 set, so its low bits need no test
+    mask = bit3.copy() if 8 in counts else np.zeros_like(bit0)
+    for high, plane in ((0, ~(bit2 | bit3)), (1, bit2)):
+        values = [count & 3 for count in counts if count >> 2 == high]
+        if values:
+            low = low_match(values, bit0, bit1)
+            mask |= plane if low is None else plane & low
+    return mask
+
+
+def popcount(words):
+    """Count the set bits in an array of uint64 words"""
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+    return int(_BYTE_POPCOUNT[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+class PackedGrid:
+    """Grid backend storing each row as packed 64-bit words
+
+    Bit i of word k in a row holds the cell at x = 64 * k + i. A generation is
+    computed for 64 cells at a time with bitwise adder logic, in bands of
+    band_rows rows so the temporaries stay small on very large universes.
+    """
+
+    def __init__(self, width, height, wrap=False, band_rows=1024, rule=CONWAY):
+        self.width = width
+        self.height = height
+        self.wrap = wrap
+        self.rule = rule
+        self.band_rows = band_rows
+        self.words = (width + WORD_BITS - 1) // WORD_BITS
+        self.rows = np.zeros((height, self.words), dtype=np.uint64)
+        self.next_rows = np.zeros_like(self.rows)
+        self.population = 0
+
+        # Bits past the right edge in the last word must always stay dead
+        tail = width % WORD_BITS
+        self.tail_mask = np.uint64((1 << tail) - 1) if tail else ~np.uint64(0)
+        self.last_bit = np.uint64((width - 1) % WORD_BITS)
+
+    def load_array(self, array):
+        """Replace the grid contents with a dense 2-D array of the same shape"""
+        packed = np.packbits(np.asarray(array) != 0, axis=1, bitorder='little')
+        buffer = np.zeros((self.height, self.words * 8), dtype=np.uint8)
+        buffer[:, :packed.shape[1]] = packed
+        self.rows = buffer.view('<u8').astype(np.uint64)
+        self.population = popcount(self.rows)
+
+    def to_array(self, y0=0, y1=None):
+        """Unpack rows y0..y1 into a dense uint8 array"""
+        rows = self.rows[y0:y1].astype('<u8', copy=False)
+        bits = np.unpackbits(rows.view(np.uint8), axis=1, bitorder='little')
+        return bits[:, :self.width]
+
+    def window(self, x0, y0, x1, y1):
+        """Cells of the rectangle [x0, x1) x [y0, y1), unpacking only the words that cover it"""
+        k0, k1 = x0 // WORD_BITS, -(-x1 // WORD_BITS)
+        rows = np.ascontiguousarray(self.rows[y0:y1, k0:k1]).astype('<u8', copy=False)
+        bits = np.unpackbits(rows.view(np.uint8), axis=1, bitorder='little')
+        return bits[:, x0 - k0 * WORD_BITS:x1 - k0 * WORD_BITS]
+
+    def get_cell(self, x, y):
+        return int((self.rows[y, x // WORD_BITS] >> np.uint64(x % WORD_BITS)) & _ONE)
+
+    def toggle_cell(self, x, y):
+        """Flip a single cell and return its new state"""
+        self.rows[y, x // WORD_BITS] ^= _ONE << np.uint64(x % WORD_BITS)
+        alive = self.get_cell(x, y)
+        self.population += 1 if alive else -1
+        return alive
+
+    def clear(self):
+        self.rows.fill(0)
+        self.population = 0
+
+    def randomize(self, density=0.3):
+        """Fill the grid with live cells at the given density"""
+        chunk = max(1, (1 << 22) // max(1, self.width))
+        for y0 in range(0, self.height, chunk):
+            y1 = min(self.height, y0 + chunk)
+            alive = np.random.random((y1 - y0, self.width)) < density
+            packed = np.packbits(alive, axis=1, bitorder='little')
+            buffer = np.zeros((y1 - y0, self.words * 8), dtype=np.uint8)
+            buffer[:, :packed.shape[1]] = packed
+            self.rows[y0:y1] = buffer.view('<u8')
+        self.population = popcount(self.rows)
+
+    def row_block(self, y0, y1):
+        """Rows y0..y1, with rows outside the grid dead or wrapped"""
+        if 0 <= y0 and y1 <= self.height:
+            return self.rows[y0:y1]
+        index = np.arange(y0, y1)
+        if self.wrap:
+            return self.rows[index % self.height]
+        block = np.zeros((y1 - y0, self.words), dtype=np.uint64)
+        inside = (index >= 0) & (index < self.height)
+        block[inside] = self.rows[index[inside]]
+        return block
+
+    def west(self, block):
+        """Align each cell's left neighbor with the cell itself"""
+        shifted = block << _ONE
+        shifted[:, 1:] |= block[:, :-1] >> _TOP
+        if self.wrap:
+            shifted[:, 0] |= (block[:, -1] >> self.last_bit) & _ONE
+        return shifted
+
+    def east(self, block):
+        """Align each cell's right neighbor with the cell itself"""
+        shifted = block >> _ONE
+        shifted[:, :-1] |= block[:, 1:] << _TOP
+        if self.wrap:
+            shifted[:, -1] |= (block[:, 0] & _ONE) << self.last_bit
+        return shifted
+
+    def neighbor_bits(self, y0, y1):
+        """Return the neighbor counts of rows y0..y1 as four bit planes"""
+        north = self.row_block(y0 - 1, y1 - 1)
+        middle = self.rows[y0:y1]
+        south = self.row_block(y0 + 1, y1 + 1)
+
+        # Full adders across the rows above and below, half adder for the
+        # left and right neighbors in the row itself
+        a, b, c = self.west(north), north, self.east(north)
+        north_sum = a ^ b ^ c
+        north_carry = (a & b) | (c & (a ^ b))
+        a, b, c = self.west(south), south, self.east(south)
+        south_sum = a ^ b ^ c
+        south_carry = (a & b) | (c & (a ^ b))
+        a, b = self.west(middle), self.east(middle)
+        middle_sum = a ^ b
+        middle_carry = a & b
+
+        # Weight 1: three sum bits
+        bit0 = north_sum ^ south_sum ^ middle_sum
+        ones_carry = (north_sum & south_sum) | (middle_sum & (north_sum ^ south_sum))
+
+        # Weight 2: three row carries plus the carry from the ones
+        twos = north_carry ^ south_carry ^ middle_carry
+        fours = (north_carry & south_carry) | (middle_carry & (north_carry ^ south_carry))
+        bit1 = twos ^ ones_carry
+        extra_four = twos & ones_carry
+
+        # Weight 4 and 8
+        bit2 = fours ^ extra_four
+        bit3 = fours & extra_four
+        return bit0, bit1, bit2, bit3
+
+    def apply_rule(self, alive, bit0, bit1, bit2, bit3):
+        """Next state of a band from its cells and neighbor count bit planes"""
+        birth, survival = self.rule.birth, self.rule.survival
+        if birth == {3} and survival == {2, 3}:
+            # Conway: exactly 3 neighbors, or 2 neighbors and alive
+            return bit1 & ~(bit2 | bit3) & (bit0 | alive)
+        if birth == survival:
+            return count_match(birth, bit0, bit1, bit2, bit3)
+        born = count_match(birth, bit0, bit1, bit2, bit3)
+        survives = count_match(survival, bit0, bit1, bit2, bit3)
+        return (alive & survives) | (~alive & born)
+
+    def step(self):
+        """Perform one generation step"""
+        population = 0
+        for y0 in range(0, self.height, self.band_rows):
+            y1 = min(self.height, y0 + self.band_rows)
+            bit0, bit1, bit2, bit3 = self.neighbor_bits(y0, y1)
+            band = self.apply_rule(self.rows[y0:y1], bit0, bit1, bit2, bit3)
+            band[:, -1] &= self.tail_mask
+            self.next_rows[y0:y1] = band
+            population += popcount(band)
+
+        self.rows, self.next_rows = self.next_rows, self.rows
+        self.population = population
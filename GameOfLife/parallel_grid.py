@@ -0,0 +1,205 @@
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from life_engine import DenseGrid, apply_rule, padded_index
+from rules import CONWAY
+
+
+def band_worker(name, height, width, y0, y1, first, last, barrier, conn, rule=CONWAY):
+    """Step rows y0..y1 of the shared grid for as many generations as asked
+
+    Neighbouring bands' edge rows are read straight out of shared memory,
+    so the only thing passed between processes is the halo itself.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    buffers = np.ndarray((2, height + 2, width + 2), dtype=np.uint8, buffer=shm.buf)
+    block = rows = None
+    try:
+        while True:
+            command = conn.recv()
+            if command is None:
+                break
+            generations, src, wrap = command
+            for _ in range(generations):
+                dst = 1 - src
+                block = buffers[src, y0:y1 + 2]
+                rows = buffers[dst, y0 + 1:y1 + 1]
+                apply_rule(padded_index(block), rule, rows[:, 1:-1])
+                if wrap:
+                    rows[:, 0] = rows[:, -2]
+                    rows[:, -1] = rows[:, 1]
+                    barrier.wait()
+                    if first:
+                        buffers[dst, 0] = buffers[dst, height]
+                    if last:
+                        buffers[dst, -1] = buffers[dst, 1]
+                barrier.wait()
+                src = dst
+            conn.send(int(np.count_nonzero(buffers[src, y0 + 1:y1 + 1, 1:-1])))
+    finally:
+        del buffers, block, rows
+        shm.close()
+
+
+class ParallelGrid:
+    """Grid backend stepped by worker processes over horizontal bands
+
+    Both generations live in one shared memory block with a one-cell halo,
+    and each worker owns a band of rows. Workers synchronise on a barrier
+    after every generation, so several generations can run per command and
+    grid contents are never pickled. Workers start on the first step.
+    """
+
+    def __init__(self, width, height, wrap=False, workers=None, rule=CONWAY):
+        self.width = width
+        self.height = height
+        self.wrap = wrap
+        self.rule = rule
+        self.workers = max(1, min(workers or os.cpu_count() or 1, height))
+        self.population = 0
+
+        size = 2 * (height + 2) * (width + 2)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.buffers = np.ndarray((2, height + 2, width + 2), dtype=np.uint8, buffer=self.shm.buf)
+        self.buffers.fill(0)
+        self.current = 0
+        self.processes = []
+        self.connections = []
+
+    @property
+    def cells(self):
+        return self.buffers[self.current, 1:-1, 1:-1]
+
+    def start_workers(self):
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(self.workers)
+        bounds = np.linspace(0, self.height, self.workers + 1).astype(int)
+        for i in range(self.workers):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=band_worker,
+                args=(self.shm.name, self.height, self.width, bounds[i], bounds[i + 1],
+                      i == 0, i == self.workers - 1, barrier, child, self.rule),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+            self.connections.append(parent)
+
+    def close(self):
+        """Stop the workers and release the shared memory"""
+        for conn in self.connections:
+            conn.send(None)
+        for process in self.processes:
+            process.join()
+        self.processes = []
+        self.connections = []
+        if self.shm is not None:
+            del self.buffers
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def load_array(self, array):
+        """Replace the grid contents with a dense 2-D array of the same shape"""
+        self.cells[:] = np.asarray(array) != 0
+        self.population = int(np.count_nonzero(self.cells))
+
+    def to_array(self):
+        return self.cells.copy()
+
+    def window(self, x0, y0, x1, y1):
+        """Cells of the rectangle [x0, x1) x [y0, y1), which must lie inside the grid"""
+        return self.cells[y0:y1, x0:x1]
+
+    def get_cell(self, x, y):
+        return int(self.cells[y, x])
+
+    def toggle_cell(self, x, y):
+        """Flip a single cell and return its new state"""
+        cells = self.cells
+        cells[y, x] = 1 - cells[y, x]
+        alive = int(cells[y, x])
+        self.population += 1 if alive else -1
+        return alive
+
+    def clear(self):
+        self.cells.fill(0)
+        self.population = 0
+
+    def randomize(self, density=0.3):
+        """Fill the grid with live cells at the given density"""
+        self.load_array(np.random.random((self.height, self.width)) < density)
+
+    def prepare_halo(self):
+        """Set the halo of the current generation for the edge mode"""
+        padded = self.buffers[self.current]
+        if self.wrap:
+            padded[1:-1, 0] = padded[1:-1, -2]
+            padded[1:-1, -1] = padded[1:-1, 1]
+            padded[0] = padded[-2]
+            padded[-1] = padded[1]
+        else:
+            padded[[0, -1], :] = 0
+            padded[:, [0, -1]] = 0
+            self.buffers[1 - self.current][[0, -1], :] = 0
+            self.buffers[1 - self.current][:, [0, -1]] = 0
+
+    def advance(self, generations):
+        """Advance generations steps with every worker running in parallel"""
+        if generations <= 0:
+            return
+        if not self.processes:
+            self.start_workers()
+        self.prepare_halo()
+        for conn in self.connections:
+            conn.send((generations, self.current, self.wrap))
+        self.population = sum(conn.recv() for conn in self.connections)
+        self.current = (self.current + generations) % 2
+
+    def step(self):
+        """Perform one generation step"""
+        self.advance(1)
+
+
+def measure_scaling(width, height, generations, worker_counts, density=0.3, seed=0):
+    """Time the parallel backend against the serial dense step
+
+    Returns one dict per worker count with the run time, the speedup over
+    DenseGrid and the parallel efficiency (speedup / workers).
+    """
+    rng = np.random.default_rng(seed)
+    initial = rng.random((height, width)) < density
+
+    serial = DenseGrid(width, height)
+    serial.load_array(initial)
+    start = time.perf_counter()
+    for _ in range(generations):
+        serial.step()
+    serial_time = time.perf_counter() - start
+
+    results = []
+    for workers in worker_counts:
+        grid = ParallelGrid(width, height, workers=workers)
+        try:
+            grid.load_array(initial)
+            grid.start_workers()
+            start = time.perf_counter()
+            grid.advance(generations)
+            elapsed = time.perf_counter() - start
+            if not np.array_equal(grid.cells, serial.cells):
+                raise RuntimeError(f"parallel result with {workers} workers differs from serial step")
+        finally:
+            grid.close()
+        speedup = serial_time / elapsed
+        results.append({
+            'workers': grid.workers,
+            'seconds': elapsed,
+            'speedup': speedup,
+            'efficiency': speedup / grid.workers,
+        })
+    return results
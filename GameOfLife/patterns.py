@@ -0,0 +1,272 @@
+import os
+import re
+import struct
+import zlib
+
+import numpy as np
+
+
+CHUNK_SIZE = 1 << 16
+
+RLE_RUN = re.compile(rb'(\d*)([A-Za-z.$!])')
+RLE_SIZE = re.compile(r'x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?')
+
+# Binary snapshot: magic, version, width, height, generation, then the rows
+# bit-packed and zlib-compressed
+SNAPSHOT_MAGIC = b'LIFE'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<4sBIIQ')
+
+PATTERN_EXTENSIONS = ('.rle', '.cells', '.snap')
+
+
+def pattern_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in PATTERN_EXTENSIONS:
+        raise ValueError(f"unknown pattern format: {path}")
+    return extension[1:]
+
+
+def read_header(path):
+    """Name, size and rule of a pattern file, without reading its cells"""
+    fmt = pattern_format(path)
+    header = {'name': os.path.splitext(os.path.basename(path))[0], 'rule': 'B3/S23', 'path': path}
+    if fmt == 'snap':
+        with open(path, 'rb') as f:
+            magic, version, width, height, generation = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"not a Life snapshot: {path}")
+        header.update(width=width, height=height, generation=generation)
+    elif fmt == 'rle':
+        with open(path, encoding='ascii', errors='replace') as f:
+            for line in f:
+                if line.startswith('#N'):
+                    header['name'] = line[2:].strip() or header['name']
+                elif not line.startswith('#'):
+                    match = RLE_SIZE.match(line.strip())
+                    if match is None:
+                        raise ValueError(f"missing RLE size line: {path}")
+                    header['width'], header['height'] = int(match.group(1)), int(match.group(2))
+                    if match.group(3):
+                        header['rule'] = match.group(3)
+                    break
+    else:
+        # Plaintext has no size line, so its size needs one pass over the rows
+        width = height = 0
+        with open(path, encoding='ascii', errors='replace') as f:
+            for line in f:
+                if line.startswith('!'):
+                    if line.startswith('!Name:'):
+                        header['name'] = line[6:].strip() or header['name']
+                    continue
+                width = max(width, len(line.rstrip()))
+                height += 1
+        header['width'], header['height'] = width, height
+    return header
+
+
+def load_pattern(path, out=None, x0=0, y0=0):
+    """Read a pattern file straight into out with its corner at (x0, y0)
+
+    Files are read in chunks and runs of live cells are written directly
+    into the array; cells falling outside out are dropped. If out is None a
+    zero array of the pattern's size is allocated. Returns out.
+    """
+    fmt = pattern_format(path)
+    if out is None:
+        header = read_header(path)
+        out = np.zeros((header['height'], header['width']), dtype=np.uint8)
+    if fmt == 'rle':
+        read_rle(path, out, x0, y0)
+    elif fmt == 'cells':
+        read_plaintext(path, out, x0, y0)
+    else:
+        read_snapshot(path, out, x0, y0)
+    return out
+
+
+def place_run(out, x, y, length):
+    """Set a horizontal run of live cells, clipped to out"""
+    height, width = out.shape
+    if 0 <= y < height:
+        start, end = max(0, x), min(width, x + length)
+        if start < end:
+            out[y, start:end] = 1
+
+
+def read_rle(path, out, x0=0, y0=0):
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.startswith(b'#'):
+                break  # the size line; cell data starts after it
+
+        x, y = x0, y0
+        carry = b''
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            data = carry + re.sub(rb'\s+', b'', chunk)
+            if not chunk:
+                carry = b''
+            else:
+                # Keep a trailing run count for the next chunk
+                digits = len(data) - len(data.rstrip(b'0123456789'))
+                carry = data[len(data) - digits:] if digits else b''
+                data = data[:len(data) - digits] if digits else data
+
+            for match in RLE_RUN.finditer(data):
+                count = int(match.group(1)) if match.group(1) else 1
+                tag = match.group(2)
+                if tag == b'!':
+                    return out
+                if tag == b'$':
+                    x = x0
+                    y += count
+                elif tag in b'b.':
+                    x += count
+                else:
+                    place_run(out, x, y, count)
+                    x += count
+            if not chunk:
+                return out
+
+
+def read_plaintext(path, out, x0=0, y0=0):
+    y = y0
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.startswith(b'!'):
+                continue
+            row = np.frombuffer(line.rstrip(), dtype=np.uint8)
+            alive = np.flatnonzero((row == ord('O')) | (row == ord('*'))) + x0
+            height, width = out.shape
+            if 0 <= y < height:
+                alive = alive[(alive >= 0) & (alive < width)]
+                out[y, alive] = 1
+            y += 1
+    return out
+
+
+def read_snapshot(path, out, x0=0, y0=0):
+    with open(path, 'rb') as f:
+        magic, version, width, height, generation = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"not a Life snapshot: {path}")
+        row_bytes = (width + 7) // 8
+        decompressor = zlib.decompressobj()
+        pending = b''
+        y = 0
+        while y < height:
+            chunk = f.read(CHUNK_SIZE)
+            pending += decompressor.decompress(chunk) if chunk else decompressor.flush()
+            rows = min(len(pending) // row_bytes, height - y)
+            if rows == 0 and not chunk:
+                raise ValueError(f"truncated Life snapshot: {path}")
+            block = np.frombuffer(pending, dtype=np.uint8, count=rows * row_bytes).reshape(rows, row_bytes)
+            cells = np.unpackbits(block, axis=1, count=width)
+            paste(out, cells, x0, y0 + y)
+            pending = pending[rows * row_bytes:]
+            y += rows
+    return out
+
+
+def paste(out, cells, x0, y0):
+    """Copy cells into out at (x0, y0), clipped to out"""
+    height, width = out.shape
+    top, left = max(0, y0), max(0, x0)
+    bottom = min(height, y0 + cells.shape[0])
+    right = min(width, x0 + cells.shape[1])
+    if top < bottom and left < right:
+        out[top:bottom, left:right] = cells[top - y0:bottom - y0, left - x0:right - x0]
+
+
+def save_pattern(grid, path, name=None, rule='B3/S23', generation=0):
+    """Write grid in the format given by the file extension"""
+    fmt = pattern_format(path)
+    grid = np.asarray(grid) != 0
+    if fmt == 'rle':
+        save_rle(grid, path, name, rule)
+    elif fmt == 'cells':
+        save_plaintext(grid, path, name)
+    else:
+        save_snapshot(grid, path, generation)
+
+
+def save_rle(grid, path, name=None, rule='B3/S23'):
+    height, width = grid.shape
+    with open(path, 'w') as f:
+        if name:
+            f.write(f"#N {name}\n")
+        f.write(f"x = {width}, y = {height}, rule = {rule}\n")
+        line = ''
+        cursor = 0  # row the next run would land on
+        for y in range(height):
+            row = grid[y].astype(np.int8)
+            if not row.any():
+                continue
+            if y > cursor:
+                line = write_rle_token(f, line, y - cursor, '$')
+                cursor = y
+
+            # Run boundaries from the row's transitions, trailing dead cells dropped
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], row, [0]))))
+            x = 0
+            for start, end in zip(edges[::2], edges[1::2]):
+                if start > x:
+                    line = write_rle_token(f, line, start - x, 'b')
+                line = write_rle_token(f, line, end - start, 'o')
+                x = end
+        f.write(line + '!\n')
+
+
+def write_rle_token(f, line, count, tag):
+    """Append a run to the current line, wrapping at 70 characters"""
+    token = (str(count) if count > 1 else '') + tag
+    if len(line) + len(token) > 70:
+        f.write(line + '\n')
+        line = ''
+    return line + token
+
+
+def save_plaintext(grid, path, name=None):
+    lookup = np.array([ord('.'), ord('O')], dtype=np.uint8)
+    with open(path, 'wb') as f:
+        if name:
+            f.write(f"!Name: {name}\n".encode('ascii'))
+        for row in grid:
+            f.write(lookup[row.astype(np.uint8)].tobytes() + b'\n')
+
+
+def save_snapshot(grid, path, generation=0):
+    height, width = grid.shape
+    compressor = zlib.compressobj()
+    with open(path, 'wb') as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, width, height, generation))
+        for y in range(0, height, 1024):
+            f.write(compressor.compress(np.packbits(grid[y:y + 1024], axis=1).tobytes()))
+        f.write(compressor.flush())
+
+
+class PatternLibrary:
+    """Named patterns from a directory of pattern files
+
+    The index of names is only built the first time it is needed, and then
+    only from file headers; cells are read when a pattern is loaded.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {}
+            if os.path.isdir(self.directory):
+                for filename in sorted(os.listdir(self.directory)):
+                    if filename.lower().endswith(PATTERN_EXTENSIONS):
+                        header = read_header(os.path.join(self.directory, filename))
+                        self._index[header['name']] = header
+        return self._index
+
+    def names(self):
+        return list(self.index)
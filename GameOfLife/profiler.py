@@ -0,0 +1,83 @@
+import csv
+import json
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+
+PHASES = ('events', 'step', 'draw_grid', 'draw_ui', 'flip')
+
+
+class FrameProfiler:
+    """Per-frame timings of the main loop phases
+
+    The loop calls begin_frame, lap(phase) after each phase and end_frame.
+    Generations are computed on the runner thread, which reports each one
+    through add_step; their time is charged to the frame in which they
+    finished. The last `window` frames are kept for mean and p95 figures,
+    and if path is given every frame is also written to it as CSV, or as
+    JSON lines when the extension is .jsonl.
+    """
+
+    def __init__(self, path=None, window=120):
+        self.path = path
+        self.visible = True
+        self.frames = deque(maxlen=window)
+        self.steps = deque()  # (seconds, generations) from the runner thread
+        self.count = 0
+        self.file = None
+        self.writer = None
+        if path is not None:
+            self.file = open(path, 'w', newline='')
+            if os.path.splitext(path)[1].lower() != '.jsonl':
+                self.writer = csv.DictWriter(self.file, ['frame', 'time'] + list(PHASES) + ['generations', 'total'])
+                self.writer.writeheader()
+
+    def begin_frame(self):
+        self.record = dict.fromkeys(PHASES, 0.0)
+        self.frame_start = self.last = time.perf_counter()
+
+    def lap(self, phase):
+        """Charge the time since the previous lap to phase"""
+        now = time.perf_counter()
+        self.record[phase] += (now - self.last) * 1000
+        self.last = now
+
+    def add_step(self, seconds, generations=1):
+        self.steps.append((seconds, generations))
+
+    def end_frame(self):
+        record = self.record
+        generations = 0
+        while self.steps:
+            seconds, count = self.steps.popleft()
+            record['step'] += seconds * 1000
+            generations += count
+        record['generations'] = generations
+        record['total'] = (self.last - self.frame_start) * 1000
+        self.frames.append(record)
+
+        self.count += 1
+        if self.file is not None:
+            row = dict(record, frame=self.count, time=time.time())
+            if self.writer is not None:
+                self.writer.writerow(row)
+            else:
+                self.file.write(json.dumps(row) + '\n')
+
+    def summary(self):
+        """(mean ms, p95 ms) of each phase and the whole frame over the window"""
+        if not self.frames:
+            return {}
+        result = {}
+        for phase in PHASES + ('total',):
+            values = np.fromiter((frame[phase] for frame in self.frames), dtype=float, count=len(self.frames))
+            result[phase] = (values.mean(), np.percentile(values, 95))
+        return result
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,117 @@
+import numpy as np
+import pygame
+
+
+class GridRenderer:
+    """Keeps the drawn grid on a cached surface and updates it incrementally
+
+    A full frame is built in bulk: the cell array is mapped to colours,
+    blitted as one pixel per cell and scaled up to cell_size, with the grid
+    lines laid over it from a cached overlay. After that only cells that
+    changed since the last update are repainted.
+
+    draw renders a view from LifeSimulation.view, built for the camera's
+    window: the cells inside it are put on the cached surface, and when
+    zoomed out each screen pixel is shaded by the live share of the block
+    of cells it covers. Nothing outside the window is read, so the cost of
+    a frame follows the screen size rather than the grid size.
+    """
+
+    # Above this share of changed cells a full rebuild is cheaper than rects
+    REBUILD_FRACTION = 0.05
+
+    def __init__(self, alive_color, dead_color, line_color):
+        self.palette = np.array([dead_color, alive_color], dtype=np.uint8)
+        self.alive_color = alive_color
+        self.dead_color = dead_color
+        self.line_color = line_color
+        self.surface = None
+        self.overlay = None
+        self.last = None
+        self.origin = None
+        self.layout = None
+
+    def resize(self, grid_width, grid_height, cell_size):
+        """Set the grid dimensions and cell size, forcing a full rebuild"""
+        self.cell_size = cell_size
+        size = (grid_width * cell_size, grid_height * cell_size)
+        self.surface = pygame.Surface(size)
+        self.overlay = self.build_overlay(grid_width, grid_height) if cell_size > 5 else None
+        self.last = None
+
+    def build_overlay(self, grid_width, grid_height):
+        """Grid lines on a colour-keyed surface, matching a 1 px rect per cell"""
+        key = (255, 0, 255)
+        overlay = pygame.Surface(self.surface.get_size())
+        overlay.fill(key)
+        overlay.set_colorkey(key)
+        width, height = overlay.get_size()
+        size = self.cell_size
+        for x in range(grid_width):
+            pygame.draw.line(overlay, self.line_color, (x * size, 0), (x * size, height - 1))
+            pygame.draw.line(overlay, self.line_color, (x * size + size - 1, 0), (x * size + size - 1, height - 1))
+        for y in range(grid_height):
+            pygame.draw.line(overlay, self.line_color, (0, y * size), (width - 1, y * size))
+            pygame.draw.line(overlay, self.line_color, (0, y * size + size - 1), (width - 1, y * size + size - 1))
+        return overlay
+
+    def draw(self, target, view, camera):
+        """Draw a view (see LifeSimulation.view) onto target through camera"""
+        cells = view['cells']
+        x0, y0 = view['origin']
+        if not cells.size:
+            return
+        if view['level']:
+            self.draw_density(target, cells, view['level'], camera.to_screen(x0, y0))
+            return
+
+        height, width = cells.shape
+        if self.layout != (width, height, camera.zoom):
+            self.layout = (width, height, camera.zoom)
+            self.resize(width, height, camera.zoom)
+        self.update(cells, (x0, y0))
+        target.blit(self.surface, camera.to_screen(x0, y0))
+
+    def draw_density(self, target, sums, level, position):
+        """One pixel per 2^level block, shaded from dead to alive by its live share"""
+        share = sums.astype(np.float32) / (1 << 2 * level)
+        dead, alive = self.palette.astype(np.float32)
+        colors = (dead + share[..., None] * (alive - dead)).astype(np.uint8)
+        target.blit(pygame.surfarray.make_surface(colors.transpose(1, 0, 2)), position)
+        self.last = None  # the cell surface is stale once we've been zoomed out
+
+    def update(self, grid, origin=None):
+        """Bring the cached surface up to date; False if nothing changed
+
+        origin identifies which part of a larger grid this is; the surface
+        is rebuilt when it changes.
+        """
+        if self.last is None or self.last.shape != grid.shape or origin != self.origin:
+            self.origin = origin
+            self.rebuild(grid)
+            return True
+
+        changed = np.argwhere(grid != self.last)
+        if len(changed) == 0:
+            return False
+        if len(changed) > grid.size * self.REBUILD_FRACTION:
+            self.rebuild(grid)
+            return True
+
+        size = self.cell_size
+        for y, x in changed:
+            rect = pygame.Rect(x * size, y * size, size, size)
+            self.surface.fill(self.alive_color if grid[y, x] else self.dead_color, rect)
+            if self.overlay is not None:
+                pygame.draw.rect(self.surface, self.line_color, rect, 1)
+        np.copyto(self.last, grid)
+        return True
+
+    def rebuild(self, grid):
+        """Redraw every cell in one blit"""
+        colors = self.palette[grid]
+        small = pygame.surfarray.make_surface(colors.transpose(1, 0, 2))
+        pygame.transform.scale(small, self.surface.get_size(), self.surface)
+        if self.overlay is not None:
+            self.surface.blit(self.overlay, (0, 0))
+        self.last = grid.copy()
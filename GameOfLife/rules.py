@@ -0,0 +1,83 @@
+import re
+
+import numpy as np
+
+
+# Well-known outer-totalistic rules by name
+NAMED_RULES = {
+    "Conway": "B3/S23",
+    "HighLife": "B36/S23",
+    "Seeds": "B2/S",
+    "Day & Night": "B3678/S34678",
+    "Life without Death": "B3/S012345678",
+    "Maze": "B3/S12345",
+    "2x2": "B36/S125",
+    "Replicator": "B1357/S1357",
+}
+
+RULE_BS = re.compile(r'B([0-8]*)/?S([0-8]*)$', re.IGNORECASE)
+RULE_SB = re.compile(r'([0-8]*)/([0-8]*)$')
+
+
+class Rule:
+    """Life-like rule: the neighbour counts that give birth and survival
+
+    table is the rule compiled into a lookup table: entry count * 2 + state
+    is the next state of a cell with that state and neighbour count. runs
+    lists the table's stretches of live entries as (start, length - 1), so
+    a whole grid can be looked up with one unsigned range test per run.
+    """
+
+    def __init__(self, birth, survival, name=None):
+        self.birth = frozenset(birth)
+        self.survival = frozenset(survival)
+        self.name = name
+        self.table = np.zeros(18, dtype=np.uint8)
+        for count in self.birth:
+            self.table[count * 2] = 1
+        for count in self.survival:
+            self.table[count * 2 + 1] = 1
+
+        self.runs = []
+        live = np.flatnonzero(self.table)
+        for start, end in zip(live[np.diff(live, prepend=-2) != 1], live[np.diff(live, append=99) != 1]):
+            self.runs.append((np.uint8(start), np.uint8(end - start)))
+
+    def __str__(self):
+        return f"B{''.join(map(str, sorted(self.birth)))}/S{''.join(map(str, sorted(self.survival)))}"
+
+    def __repr__(self):
+        return f"Rule({str(self)!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Rule) and (self.birth, self.survival) == (other.birth, other.survival)
+
+    def __hash__(self):
+        return hash((self.birth, self.survival))
+
+    @property
+    def label(self):
+        return f"{self.name} ({self})" if self.name else str(self)
+
+
+def parse_rule(text):
+    """Rule from a name, B/S notation ("B36/S23", "b3s23") or S/B notation ("23/3")"""
+    if isinstance(text, Rule):
+        return text
+    names = {name.lower(): rulestring for name, rulestring in NAMED_RULES.items()}
+    compact = names.get(text.strip().lower(), text).replace(' ', '')
+    match = RULE_BS.match(compact)
+    if match is not None:
+        birth, survival = match.groups()
+    else:
+        match = RULE_SB.match(compact)
+        if match is None:
+            raise ValueError(f"not a B/S rule: {text!r}")
+        survival, birth = match.groups()
+
+    rule = Rule(map(int, birth), map(int, survival))
+    rule.name = next((name for name, rulestring in NAMED_RULES.items() if rulestring == str(rule)), None)
+    return rule
+
+
+CONWAY = parse_rule("B3/S23")
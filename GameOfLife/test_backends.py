@@ -0,0 +1,109 @@
+"""Every grid backend must match a cell-by-cell reference step exactly
+
+    python -m pytest GameOfLife
+"""
+import numpy as np
+import pytest
+
+from hashlife import HashLife
+from life_core import LifeSimulation
+from life_engine import DenseGrid
+from packed_grid import PackedGrid
+from rules import NAMED_RULES, parse_rule
+from tiled_grid import TiledGrid
+
+RULES = ["Conway", "HighLife", "Seeds", "Day & Night", "Replicator"]
+GENERATIONS = 12
+
+
+def reference_step(grid, rule, wrap):
+    """One generation, counting each cell's neighbors one at a time"""
+    height, width = grid.shape
+    out = np.zeros_like(grid)
+    for y in range(height):
+        for x in range(width):
+            count = 0
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    if dx == 0 and dy == 0:
+                        continue
+                    nx, ny = x + dx, y + dy
+                    if wrap:
+                        count += grid[ny % height, nx % width]
+                    elif 0 <= nx < width and 0 <= ny < height:
+                        count += grid[ny, nx]
+            out[y, x] = count in (rule.survival if grid[y, x] else rule.birth)
+    return out
+
+
+def random_grid(width, height, seed, density=0.35):
+    return (np.random.default_rng(seed).random((height, width)) < density).astype(np.uint8)
+
+
+def check_backend(board, grid, rule, wrap):
+    board.load_array(grid)
+    for generation in range(GENERATIONS):
+        grid = reference_step(grid, rule, wrap)
+        board.step()
+        assert np.array_equal(board.to_array(), grid), f"generation {generation + 1}"
+        assert board.population == grid.sum()
+
+
+# Widths straddle the 64-bit words of PackedGrid and the tiles of TiledGrid
+@pytest.mark.parametrize('backend', [DenseGrid, PackedGrid, TiledGrid])
+@pytest.mark.parametrize('name', RULES)
+@pytest.mark.parametrize('wrap', [False, True])
+@pytest.mark.parametrize('width, height', [(70, 37), (64, 33)])
+def test_bounded_backends(backend, name, wrap, width, height):
+    rule = parse_rule(NAMED_RULES[name])
+    grid = random_grid(width, height, seed=RULES.index(name) * 1000 + width * 2 + wrap)
+    check_backend(backend(width, height, wrap, rule=rule), grid, rule, wrap)
+
+
+@pytest.mark.parametrize('name', RULES)
+def test_hashlife(name):
+    # A soup in the middle of a larger dead board never reaches its edges
+    # within GENERATIONS, so the bounded reference matches the unbounded universe
+    rule = parse_rule(NAMED_RULES[name])
+    grid = np.zeros((48, 48), dtype=np.uint8)
+    grid[16:32, 16:32] = random_grid(16, 16, seed=len(name))
+    check_backend(HashLife(48, 48, rule=rule), grid, rule, wrap=False)
+
+
+def test_hashlife_jump():
+    """advance(n) jumps must land where n single steps do"""
+    rule = parse_rule("B3/S23")
+    grid = np.zeros((64, 64), dtype=np.uint8)
+    grid[24:40, 24:40] = random_grid(16, 16, seed=7)
+    expected = grid
+    for _ in range(16):
+        expected = reference_step(expected, rule, False)
+    board = HashLife(64, 64, rule=rule)
+    board.load_array(grid)
+    board.advance(16)
+    assert np.array_equal(board.to_array(), expected)
+
+
+@pytest.mark.parametrize('backend', ["Dense", "Packed", "Tiled", "HashLife"])
+@pytest.mark.parametrize('window', [(0, 0, 70, 37, 0), (5, 3, 66, 20, 0), (64, 0, 130, 40, 1), (-32, -8, 96, 64, 3)])
+def test_view_matches_board(backend, window):
+    """LifeSimulation.view reads the same cells and block sums as the whole board"""
+    grid = random_grid(70, 37, seed=11)
+    sim = LifeSimulation(70, 37, backend)
+    sim.load_array(grid)
+    x0, y0, x1, y1, level = window
+    size = 1 << level
+    # The board inside a dead border wide enough for every window, with (0, 0) at (64, 64)
+    whole = np.zeros((256, 256), dtype=np.uint8)
+    whole[64:101, 64:134] = grid
+    if backend != "HashLife":
+        x0, y0, x1, y1 = max(0, x0), max(0, y0), min(70, x1), min(37, y1)
+    expected = whole[y0 + 64:y1 + 64, x0 + 64:x1 + 64]
+    rows, columns = -(-expected.shape[0] // size), -(-expected.shape[1] // size)
+    padded = np.zeros((rows * size, columns * size), dtype=np.int64)
+    padded[:expected.shape[0], :expected.shape[1]] = expected
+    expected = padded.reshape(rows, size, columns, size).sum(axis=(1, 3))
+
+    view = sim.view(*window)
+    assert view['origin'] == (x0, y0)
+    assert np.array_equal(view['cells'], expected)
@@ -0,0 +1,121 @@
+import numpy as np
+
+from life_engine import apply_rule, neighbor_counts, padded_index
+from rules import CONWAY
+
+
+class TiledGrid:
+    """Grid backend that only recomputes tiles near last generation's changes
+
+    The grid is split into tile_size x tile_size tiles. A tile is recomputed
+    only if it or one of its eight neighbors changed in the previous
+    generation, and skipped outright when it and its halo are empty (unless
+    the rule has births on 0 neighbors), so the cost of a step follows the
+    activity on the board instead of its area.
+    tiles_recomputed holds the number of tiles evaluated by the last step.
+    """
+
+    def __init__(self, width, height, wrap=False, tile_size=32, rule=CONWAY):
+        self.width = width
+        self.height = height
+        self.rule = rule
+        self.tile_size = tile_size
+        self.tiles_x = (width + tile_size - 1) // tile_size
+        self.tiles_y = (height + tile_size - 1) // tile_size
+
+        # Cells live inside a buffer with a one-cell halo so a tile and its
+        # neighbors can be sliced without padding on every step
+        self.padded = np.zeros((height + 2, width + 2), dtype=np.uint8)
+        self.cells = self.padded[1:-1, 1:-1]
+        self.changed = np.zeros((self.tiles_y, self.tiles_x), dtype=bool)
+        self.population = 0
+        self.tiles_recomputed = 0
+        self._wrap = wrap
+
+    @property
+    def tile_count(self):
+        return self.tiles_x * self.tiles_y
+
+    @property
+    def wrap(self):
+        return self._wrap
+
+    @wrap.setter
+    def wrap(self, wrap):
+        # The halo means something different now, so the edges must be redone
+        self._wrap = wrap
+        self.padded[0, :] = self.padded[-1, :] = 0
+        self.padded[:, 0] = self.padded[:, -1] = 0
+        self.changed[[0, -1], :] = True
+        self.changed[:, [0, -1]] = True
+
+    def load_array(self, array):
+        """Replace the grid contents with a dense 2-D array of the same shape"""
+        self.cells[:] = np.asarray(array) != 0
+        self.population = int(np.count_nonzero(self.cells))
+        self.changed.fill(True)
+
+    def to_array(self):
+        return self.cells
+
+    def window(self, x0, y0, x1, y1):
+        """Cells of the rectangle [x0, x1) x [y0, y1), which must lie inside the grid"""
+        return self.cells[y0:y1, x0:x1]
+
+    def get_cell(self, x, y):
+        return int(self.cells[y, x])
+
+    def toggle_cell(self, x, y):
+        """Flip a single cell and return its new state"""
+        self.cells[y, x] = 1 - self.cells[y, x]
+        alive = int(self.cells[y, x])
+        self.population += 1 if alive else -1
+        self.changed[y // self.tile_size, x // self.tile_size] = True
+        return alive
+
+    def clear(self):
+        self.cells.fill(0)
+        self.population = 0
+        self.changed.fill(0 in self.rule.birth)  # B0 rules come alive from nothing
+
+    def randomize(self, density=0.3):
+        """Fill the grid with live cells at the given density"""
+        self.load_array(np.random.random((self.height, self.width)) < density)
+
+    def refresh_halo(self):
+        """Copy opposite edges into the halo when wrapping"""
+        padded = self.padded
+        padded[0, 1:-1] = padded[-2, 1:-1]
+        padded[-1, 1:-1] = padded[1, 1:-1]
+        padded[:, 0] = padded[:, -2]
+        padded[:, -1] = padded[:, 1]
+
+    def step(self):
+        """Perform one generation step over the active tiles"""
+        if self.wrap:
+            self.refresh_halo()
+
+        # A tile can only change if something in its 3x3 tile block changed
+        active = self.changed | (neighbor_counts(self.changed, self.wrap) > 0)
+        size = self.tile_size
+        updates = []
+        skip_empty = 0 not in self.rule.birth
+        for ty, tx in np.argwhere(active):
+            y0, x0 = ty * size, tx * size
+            y1, x1 = min(self.height, y0 + size), min(self.width, x0 + size)
+            block = self.padded[y0:y1 + 2, x0:x1 + 2]
+            if skip_empty and not block.any():
+                continue
+            new = apply_rule(padded_index(block), self.rule).view(np.uint8)
+            updates.append((ty, tx, y0, y1, x0, x1, new))
+
+        # Write back only after every active tile has read the old state
+        self.changed.fill(False)
+        for ty, tx, y0, y1, x0, x1, new in updates:
+            old = self.cells[y0:y1, x0:x1]
+            diff = np.count_nonzero(new != old)
+            if diff:
+                self.population += int(np.count_nonzero(new)) - int(np.count_nonzero(old))
+                old[:] = new
+                self.changed[ty, tx] = True
+        self.tiles_recomputed = len(updates)
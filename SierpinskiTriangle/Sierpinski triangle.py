@@ -4,6 +4,24 @@ import random
 import math
 import time
 
+import numpy as np
+
+from deep_zoom import DeepZoom, TileCache
+from density import DensityBuffer, to_ppm
+from ifs import presets
+from subdivision import count, fill, polygons
+
+# Most points generated in one generate_step callback
+MAX_CHUNK = 100000
+
+# Each mouse wheel step zooms by ZOOM_STEP; zoom levels are whole numbers of steps
+ZOOM_STEP = 1.1
+MAX_ZOOM_LEVEL = 24        # about 10x
+MAX_DEEP_ZOOM_LEVEL = 240  # about 10^10x, near the limit of float64 coordinates
+
+# World rectangle the other fractals are fitted into, the triangle's own box
+PRESET_BOUNDS = (200, 100, 600, 400)
+
 class SierpinskiTriangle:
     def __init__(self, root):
         self.root = root
@@ -17,15 +35,26 @@ class SierpinskiTriangle:
             (600, 400)    # Bottom right
         ]
         
+        # The iterated function system being drawn; the triangle is one preset
+        self.presets = presets(self.vertices, PRESET_BOUNDS)
+        self.ifs = self.presets["Sierpinski triangle"]
+        
         # Current state
         self.current_point = None
-        self.points = []
+        self.game = None
+        self.polygons = None
+        self.seed = None  # seed for the chaos game's random maps; None picks a fresh one
+        self.density = DensityBuffer(self.density_bounds())
+        self.image = None
+        self.deep_zoom = self.make_deep_zoom()
+        self.tiles = TileCache(self.render_tile)
         self.max_iterations = 1000
         self.current_iteration = 0
         self.is_running = False
         self.speed = 50
         
         # Zoom and pan
+        self.zoom_level = 0
         self.zoom_factor = 1.0
         self.pan_x = 0
         self.pan_y = 0
@@ -53,6 +82,12 @@ class SierpinskiTriangle:
         controls1 = tk.Frame(control_frame, bg='#3c3c3c')
         controls1.pack(pady=5)
         
+        tk.Label(controls1, text="Fractal:", fg='white', bg='#3c3c3c').pack(side=tk.LEFT, padx=5)
+        self.preset_var = tk.StringVar(value=self.ifs.name)
+        preset_menu = tk.OptionMenu(controls1, self.preset_var, *self.presets, command=self.select_preset)
+        preset_menu.config(bg='#4c4c4c', fg='white', highlightthickness=0, width=16)
+        preset_menu.pack(side=tk.LEFT, padx=(5, 20))
+        
         tk.Label(controls1, text="Iterations:", fg='white', bg='#3c3c3c').pack(side=tk.LEFT, padx=5)
         self.iterations_var = tk.StringVar(value="5000")
         iterations_entry = tk.Entry(controls1, textvariable=self.iterations_var, width=8, 
@@ -66,6 +101,16 @@ class SierpinskiTriangle:
                               highlightbackground='#3c3c3c', length=150)
         speed_scale.pack(side=tk.LEFT, padx=5)
         
+        self.log_scale_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(controls1, text="Log density", variable=self.log_scale_var,
+                       command=self.on_log_scale, fg='white', bg='#3c3c3c',
+                       selectcolor='#4c4c4c', activebackground='#3c3c3c').pack(side=tk.LEFT, padx=(20, 5))
+        
+        self.deep_zoom_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(controls1, text="Deep zoom", variable=self.deep_zoom_var,
+                       command=self.on_deep_zoom, fg='white', bg='#3c3c3c',
+                       selectcolor='#4c4c4c', activebackground='#3c3c3c').pack(side=tk.LEFT, padx=5)
+        
         # Controls row 2
         controls2 = tk.Frame(control_frame, bg='#3c3c3c')
         controls2.pack(pady=5)
@@ -90,6 +135,17 @@ class SierpinskiTriangle:
                                    relief=tk.FLAT, padx=20)
         self.random_btn.pack(side=tk.LEFT, padx=5)
         
+        tk.Label(controls2, text="Depth:", fg='white', bg='#3c3c3c').pack(side=tk.LEFT, padx=(20, 5))
+        self.depth_var = tk.StringVar(value="8")
+        depth_entry = tk.Entry(controls2, textvariable=self.depth_var, width=4,
+                               bg='#4c4c4c', fg='white', insertbackground='white')
+        depth_entry.pack(side=tk.LEFT, padx=5)
+        
+        self.subdivide_btn = tk.Button(controls2, text="Subdivide", command=self.start_subdivision,
+                                      bg='#9C27B0', fg='white', font=('Arial', 10, 'bold'),
+                                      relief=tk.FLAT, padx=20)
+        self.subdivide_btn.pack(side=tk.LEFT, padx=5)
+        
         # Progress bar
         progress_frame = tk.Frame(control_frame, bg='#3c3c3c')
         progress_frame.pack(fill=tk.X, pady=5, padx=20)
@@ -123,31 +179,76 @@ class SierpinskiTriangle:
         
         # Instructions
         instructions = ("Instructions: Click on canvas to set starting point, or use 'Random Point' button.\n"
-                       "Mouse wheel to zoom, right-click and drag to pan.")
+                       "Mouse wheel to zoom, right-click and drag to pan. Tick 'Deep zoom' to zoom in without limit.")
         tk.Label(main_frame, text=instructions, fg='#888888', bg='#2b2b2b', 
                 font=('Arial', 9)).pack(pady=5)
         
+    def density_bounds(self):
+        """World rectangle the density buffer covers: the attractor's bounding box"""
+        return self.ifs.bounds()
+    
+    def make_deep_zoom(self):
+        """Tile renderer for the current fractal, or None if it can't be deep zoomed"""
+        try:
+            return DeepZoom(self.ifs)
+        except ValueError:
+            return None
+    
+    def deep_zoom_active(self):
+        return self.deep_zoom_var.get() and self.deep_zoom is not None
+    
+    def select_preset(self, name):
+        self.ifs = self.presets[name]
+        self.density = DensityBuffer(self.density_bounds())
+        self.deep_zoom = self.make_deep_zoom()
+        self.tiles.clear()
+        self.set_zoom_level(self.zoom_level)
+        self.reset()
+    
     def draw_initial_triangle(self):
         self.canvas.delete("all")
         
-        # Draw triangle vertices
-        for i, vertex in enumerate(self.vertices):
-            x, y = self.transform_point(vertex)
-            self.canvas.create_oval(x-4, y-4, x+4, y+4, fill='red', outline='darkred', width=2)
-            self.canvas.create_text(x, y-15, text=f"V{i+1}", fill='white', font=('Arial', 10, 'bold'))
-        
-        for i in range(3):
-            x1, y1 = self.transform_point(self.vertices[i])
-            x2, y2 = self.transform_point(self.vertices[(i+1) % 3])
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if self.deep_zoom_active():
+            # Tiles generated for the view itself, so detail holds up at any zoom
+            for tx, ty, x, y in self.deep_zoom.visible_tiles(width, height, self.zoom_factor,
+                                                             self.pan_x, self.pan_y):
+                self.canvas.create_image(x, y, image=self.tiles.get((self.zoom_level, tx, ty)), anchor=tk.NW)
+        else:
+            # All points as one image, resampled from the density buffer
+            pixels = self.density.render(width, height, self.zoom_factor, self.pan_x, self.pan_y,
+                                         self.log_scale_var.get())
+            self.image = tk.PhotoImage(data=to_ppm(pixels), format='PPM')
+            self.canvas.create_image(0, 0, image=self.image, anchor=tk.NW)
+        
+        # Draw the outline's vertices (the triangle's for the triangle)
+        outline = self.ifs.outline
+        if outline:
+            for i, (x, y) in enumerate(self.transform_points(outline).tolist()):
+                self.canvas.create_oval(x-4, y-4, x+4, y+4, fill='red', outline='darkred', width=2)
+                self.canvas.create_text(x, y-15, text=f"V{i+1}", fill='white', font=('Arial', 10, 'bold'))
+        
+        for i in range(len(outline)):
+            x1, y1 = self.transform_point(outline[i])
+            x2, y2 = self.transform_point(outline[(i+1) % len(outline)])
             self.canvas.create_line(x1, y1, x2, y2, fill='gray', width=1, dash=(5, 5))
         
         if self.current_point:
             x, y = self.transform_point(self.current_point)
             self.canvas.create_oval(x-3, y-3, x+3, y+3, fill='yellow', outline='orange', width=2)
-            
-        for point in self.points:
-            x, y = self.transform_point(point)
-            self.canvas.create_oval(x-1, y-1, x+1, y+1, fill='lime', outline='')
+    
+    def render_tile(self, zoom_level, tx, ty):
+        pixels = self.deep_zoom.render_tile(ZOOM_STEP ** zoom_level, tx, ty, self.log_scale_var.get())
+        return tk.PhotoImage(data=to_ppm(pixels), format='PPM')
+    
+    def on_log_scale(self):
+        self.tiles.clear()
+        self.draw_initial_triangle()
+    
+    def on_deep_zoom(self):
+        if not self.deep_zoom_active():
+            self.set_zoom_level(self.zoom_level)
+        self.draw_initial_triangle()
     
     def transform_point(self, point):
         """Transform point based on zoom and pan"""
@@ -156,6 +257,11 @@ class SierpinskiTriangle:
         y = (y + self.pan_y) * self.zoom_factor + self.canvas.winfo_height() / 2
         return x, y
     
+    def transform_points(self, points):
+        """transform_point for a whole (n, 2) array of points at once"""
+        offset = np.array([self.canvas.winfo_width(), self.canvas.winfo_height()]) / 2
+        return (np.asarray(points) + (self.pan_x, self.pan_y)) * self.zoom_factor + offset
+    
     def inverse_transform_point(self, screen_x, screen_y):
         """Transform screen coordinates back to world coordinates"""
         x = (screen_x - self.canvas.winfo_width() / 2) / self.zoom_factor - self.pan_x
@@ -168,13 +274,25 @@ class SierpinskiTriangle:
             self.current_point = (world_x, world_y)
             self.draw_initial_triangle()
     
+    def set_zoom_level(self, level, screen_x=None, screen_y=None):
+        """Zoom to ZOOM_STEP ** level, keeping the point under (screen_x, screen_y) still"""
+        if screen_x is None:
+            screen_x, screen_y = self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2
+        world_x, world_y = self.inverse_transform_point(screen_x, screen_y)
+        
+        max_level = MAX_DEEP_ZOOM_LEVEL if self.deep_zoom_active() else MAX_ZOOM_LEVEL
+        self.zoom_level = max(-MAX_ZOOM_LEVEL, min(max_level, level))
+        self.zoom_factor = ZOOM_STEP ** self.zoom_level
+        
+        self.pan_x = (screen_x - self.canvas.winfo_width() / 2) / self.zoom_factor - world_x
+        self.pan_y = (screen_y - self.canvas.winfo_height() / 2) / self.zoom_factor - world_y
+    
     def on_mouse_wheel(self, event):
         if event.delta > 0 or event.num == 4:
-            self.zoom_factor *= 1.1
+            self.set_zoom_level(self.zoom_level + 1, event.x, event.y)
         else:
-            self.zoom_factor /= 1.1
+            self.set_zoom_level(self.zoom_level - 1, event.x, event.y)
         
-        self.zoom_factor = max(0.1, min(10.0, self.zoom_factor))
         self.draw_initial_triangle()
     
     def start_pan(self, event):
@@ -212,7 +330,8 @@ class SierpinskiTriangle:
         
         self.is_running = True
         self.current_iteration = 0
-        self.points = []
+        self.density.clear()
+        self.game = self.ifs.game(self.current_point, self.seed)
         self.progress_bar['maximum'] = self.max_iterations
         self.start_btn.config(state='disabled')
         
@@ -225,36 +344,74 @@ class SierpinskiTriangle:
     def reset(self):
         self.is_running = False
         self.current_point = None
-        self.points = []
+        self.density.clear()
         self.current_iteration = 0
         self.progress_bar['value'] = 0
         self.progress_var.set("0 / 0")
         self.start_btn.config(state='normal')
         self.draw_initial_triangle()
     
+    def start_subdivision(self):
+        """Fill the exact depth-N set by subdividing the outline, instead of playing the chaos game"""
+        if self.is_running:
+            return
+        if not self.ifs.outline:
+            self.progress_var.set(f"{self.ifs.name} has no outline to subdivide")
+            return
+        try:
+            depth = max(0, int(self.depth_var.get()))
+        except ValueError:
+            depth = 8
+            self.depth_var.set("8")
+        
+        self.is_running = True
+        self.current_point = None
+        self.density.clear()
+        self.polygons = polygons(self.ifs, self.ifs.outline, depth)
+        self.current_iteration = 0
+        self.max_iterations = count(self.ifs, depth)
+        self.progress_bar['maximum'] = self.max_iterations
+        self.start_btn.config(state='disabled')
+        
+        self.subdivide_step()
+    
+    def subdivide_step(self):
+        batch = next(self.polygons, None) if self.is_running else None
+        if batch is None:
+            self.is_running = False
+            self.start_btn.config(state='normal')
+            return
+        
+        # One block of polygons per callback keeps the window responsive
+        fill(self.density, batch)
+        self.current_iteration += len(batch)
+        self.progress_bar['value'] = self.current_iteration
+        self.progress_var.set(f"{self.current_iteration} / {self.max_iterations} polygons")
+        self.draw_initial_triangle()
+        
+        self.root.after(1, self.subdivide_step)
+    
     def generate_step(self):
         if not self.is_running or self.current_iteration >= self.max_iterations:
             self.is_running = False
             self.start_btn.config(state='normal')
             return
         
-        chosen_vertex = random.choice(self.vertices)
-        
-        new_x = (self.current_point[0] + chosen_vertex[0]) / 2
-        new_y = (self.current_point[1] + chosen_vertex[1]) / 2
+        # A whole chunk of points per callback, growing with the speed setting
+        self.speed = self.speed_var.get()
+        batch = min(self.speed ** 2, MAX_CHUNK, self.max_iterations - self.current_iteration)
+        chunk = self.game.take(batch)
         
-        self.current_point = (new_x, new_y)
-        self.points.append(self.current_point)
+        self.current_point = tuple(chunk[-1].tolist())
+        self.density.add(chunk)
         
-        self.current_iteration += 1
+        self.current_iteration += batch
         self.progress_bar['value'] = self.current_iteration
         self.progress_var.set(f"{self.current_iteration} / {self.max_iterations}")
         
-        if self.current_iteration % max(1, self.max_iterations // 100) == 0:
-            self.draw_initial_triangle()
-            self.root.update_idletasks()
+        # Redrawing costs the same at any point count, so show every chunk
+        self.draw_initial_triangle()
 
-        self.speed = self.speed_var.get()
         self.root.after(max(1, 201 - self.speed), self.generate_step)
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from density import shade
+
+
+class TileCache:
+    """Least recently used cache of rendered tiles
+
+    get(key) returns the cached tile or calls render(*key) to make it,
+    keeping at most size tiles.
+    """
+
+    def __init__(self, render, size=256):
+        self.render = render
+        self.size = size
+        self.tiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+        self.misses += 1
+        tile = self.tiles[key] = self.render(*key)
+        while len(self.tiles) > self.size:
+            self.tiles.popitem(last=False)
+        return tile
+
+    def clear(self):
+        self.tiles.clear()
+
+
+class DeepZoom:
+    """Renders square tiles of a self-similar IFS attractor at any magnification
+
+    Works for systems whose maps are all scalings p -> s p + e by the same
+    factor |s| (which may be negative), picked with equal probability, such
+    as the Sierpinski triangle: ifs.ratios() must not be None. The piece
+    with address a1..ad is the whole attractor under map a1, then a2, ...,
+    ad, which is again a scaling p -> S p + c. A tile only samples the
+    pieces at the depth where they are about a tile across and that overlap
+    it, found by descending the addresses and skipping every branch outside
+    the tile, so the work per tile is the same at any zoom.
+
+    Each piece gets points_per_piece points from a game seeded by its
+    address, so neighbouring tiles agree along their edges and every tile
+    at a zoom level is shaded on the same scale.
+    """
+
+    def __init__(self, ifs, tile=256, points_per_piece=50000, seed=0):
+        ratios = ifs.ratios()
+        if ratios is None or not ifs.uniform or not np.allclose(np.abs(ratios), abs(ratios[0])):
+            raise ValueError(f"{ifs.name} is not made of equally likely scalings by one factor")
+        self.ifs = ifs
+        self.ratios = ratios
+        self.ratio = abs(ratios[0])
+        self.tile = tile
+        self.points_per_piece = points_per_piece
+        self.seed = seed
+        # The bounds are estimated from samples, so leave a little room around them
+        x0, y0, x1, y1 = ifs.bounds()
+        margin = 0.01 * max(x1 - x0, y1 - y0)
+        self.low = np.array([x0 - margin, y0 - margin])
+        self.high = np.array([x1 + margin, y1 + margin])
+        self.side = float((self.high - self.low).max())
+        self.dimension = math.log(len(ifs)) / -math.log(self.ratio)
+
+    def depth(self, zoom):
+        """Address length at which a piece is at most one tile across"""
+        return max(0, math.ceil(math.log(self.side * zoom / self.tile) / -math.log(self.ratio)))
+
+    def pieces(self, x0, y0, x1, y1, depth):
+        """(depth, address, scale, offset) of every piece overlapping a world rectangle"""
+        found = []
+        stack = [(0, 0, 1.0, np.zeros(2))]
+        while stack:
+            level, address, scale, offset = stack.pop()
+            low = np.minimum(self.low * scale, self.high * scale) + offset
+            high = np.maximum(self.low * scale, self.high * scale) + offset
+            if low[0] >= x1 or high[0] <= x0 or low[1] >= y1 or high[1] <= y0:
+                continue
+            if level == depth:
+                found.append((level, address, scale, offset))
+                continue
+            for index, (ratio, shift) in enumerate(zip(self.ratios, self.ifs.offsets)):
+                stack.append((level + 1, address * len(self.ratios) + index, scale * ratio, offset + scale * shift))
+        return found
+
+    def sample(self, depth, address):
+        """points_per_piece points of the piece, before its scale and offset"""
+        start = self.ifs.fixed_point()  # on the attractor, so no points stray outside it
+        game = self.ifs.game(start, seed=np.random.SeedSequence([self.seed, depth, address]))
+        return game.take(self.points_per_piece)
+
+    def render_tile(self, zoom, tx, ty, log_scale=True):
+        """(tile, tile, 3) uint8 image of the world square [tx, tx + 1) x [ty, ty + 1) tiles at zoom"""
+        size = self.tile
+        x0, y0 = tx * size / zoom, ty * size / zoom
+        depth = self.depth(zoom)
+        counts = np.zeros(size * size, dtype=np.int64)
+        for level, address, scale, offset in self.pieces(x0, y0, x0 + size / zoom, y0 + size / zoom, depth):
+            points = self.sample(level, address) * scale + offset
+            px = np.floor(points[:, 0] * zoom - tx * size)
+            py = np.floor(points[:, 1] * zoom - ty * size)
+            inside = (px >= 0) & (px < size) & (py >= 0) & (py < size)
+            counts += np.bincount(py[inside].astype(np.intp) * size + px[inside].astype(np.intp),
+                                  minlength=size * size)
+
+        # A piece s pixels across covers about s^dimension pixels, so this is
+        # a few times the mean hits per covered pixel at every depth
+        pixels = (self.side * zoom * self.ratio ** depth) ** self.dimension
+        peak = max(1.0, 4 * self.points_per_piece / max(pixels, 1.0))
+        return shade(counts.reshape(size, size), peak, log_scale)
+
+    def visible_tiles(self, width, height, zoom, pan_x, pan_y):
+        """(tx, ty, screen x, screen y) of the tiles covering a width x height view
+
+        Uses the same mapping as SierpinskiTriangle.transform_point:
+        screen = (world + pan) * zoom + half the view size.
+        """
+        size = self.tile
+        left = pan_x * zoom + width / 2
+        top = pan_y * zoom + height / 2
+        tiles = []
+        for ty in range(math.floor(-top / size), math.floor((height - 1 - top) / size) + 1):
+            for tx in range(math.floor(-left / size), math.floor((width - 1 - left) / size) + 1):
+                tiles.append((tx, ty, round(tx * size + left), round(ty * size + top)))
+        return tiles
@@ -0,0 +1,108 @@
+import numpy as np
+
+
+# Colour of the densest pixel; the rest are scaled towards black
+COLOUR = np.array([0, 255, 0], dtype=np.float32)
+
+
+class DensityBuffer:
+    """Hit counts of points in a fixed grid of bins over a world rectangle
+
+    bounds is (x0, y0, x1, y1) in world coordinates, covered by
+    scale bins per unit. Points are added as they arrive, and render
+    resamples the counts for any zoom and pan through a summed-area table,
+    so drawing costs the same however many points have been added.
+    """
+
+    def __init__(self, bounds, scale=4, shape=None):
+        x0, y0, x1, y1 = bounds
+        self.x0 = x0
+        self.y0 = y0
+        self.scale = scale
+        if shape is None:
+            shape = max(1, int(np.ceil((y1 - y0) * scale))), max(1, int(np.ceil((x1 - x0) * scale)))
+        self.height, self.width = shape
+        self.counts = np.zeros((self.height, self.width), dtype=np.int64)
+        self.total = 0
+        self.table = None
+
+    @classmethod
+    def fitted(cls, bounds, width, height):
+        """A width x height buffer showing all of bounds, centred, at the largest scale that fits"""
+        x0, y0, x1, y1 = bounds
+        scale = min(width / (x1 - x0), height / (y1 - y0))
+        left = (x0 + x1) / 2 - width / 2 / scale
+        top = (y0 + y1) / 2 - height / 2 / scale
+        return cls((left, top, left + width / scale, top + height / scale), scale, (height, width))
+
+    def add(self, points):
+        """Count an (n, 2) array of world points; points outside the bounds are dropped"""
+        bx = np.floor((points[:, 0] - self.x0) * self.scale)
+        by = np.floor((points[:, 1] - self.y0) * self.scale)
+        inside = (bx >= 0) & (bx < self.width) & (by >= 0) & (by < self.height)
+        index = by[inside].astype(np.intp) * self.width + bx[inside].astype(np.intp)
+        np.add.at(self.counts.reshape(-1), index, 1)
+        self.total += len(points)
+        self.table = None
+
+    def clear(self):
+        self.counts[:] = 0
+        self.total = 0
+        self.table = None
+
+    def summed_area(self):
+        """table[y, x] = sum of counts[:y, :x], rebuilt after points are added"""
+        if self.table is None:
+            table = np.zeros((self.height + 1, self.width + 1), dtype=np.int64)
+            np.cumsum(np.cumsum(self.counts, axis=0), axis=1, out=table[1:, 1:])
+            self.table = table
+        return self.table
+
+    def bin_edges(self, pixels, offset, zoom, origin, bins):
+        """First and one-past-last bin under each of pixels screen pixels
+
+        A screen pixel p covers world [(p - offset) / zoom, (p + 1 - offset) / zoom).
+        Pixels smaller than a bin still take the whole bin they fall in.
+        """
+        edges = (np.arange(pixels + 1) - offset) / zoom
+        edges = np.floor((edges - origin) * self.scale)
+        first = edges[:-1]
+        last = np.maximum(edges[1:], first + 1)
+        return np.clip(first, 0, bins).astype(np.intp), np.clip(last, 0, bins).astype(np.intp)
+
+    def render(self, width, height, zoom, pan_x, pan_y, log_scale=True):
+        """(height, width, 3) uint8 image of the counts as seen on screen
+
+        Screen position is (world + pan) * zoom + half the screen size, as in
+        SierpinskiTriangle.transform_point. log_scale is passed to shade.
+        """
+        table = self.summed_area()
+        x_first, x_last = self.bin_edges(width, width / 2 + pan_x * zoom, zoom, self.x0, self.width)
+        y_first, y_last = self.bin_edges(height, height / 2 + pan_y * zoom, zoom, self.y0, self.height)
+        hits = (table[np.ix_(y_last, x_last)] - table[np.ix_(y_first, x_last)]
+                - table[np.ix_(y_last, x_first)] + table[np.ix_(y_first, x_first)])
+
+        return shade(hits, hits.max() if hits.size else 0, log_scale)
+
+
+def shade(hits, peak, log_scale=True):
+    """RGB uint8 image of hit counts, with peak (and anything above it) at full COLOUR
+
+    With log_scale the brightness follows log(1 + count), which shows the
+    sparse parts of a set.
+    """
+    image = np.zeros(hits.shape + (3,), dtype=np.uint8)
+    if peak > 0:
+        if log_scale:
+            level = np.log1p(hits, dtype=np.float32) / np.float32(np.log1p(peak))
+        else:
+            level = hits.astype(np.float32) / np.float32(peak)
+        np.minimum(level, 1, out=level)
+        np.multiply(level[..., None], COLOUR, out=image, casting='unsafe')
+    return image
+
+
+def to_ppm(image):
+    """Binary PPM bytes of an RGB image, which tk.PhotoImage reads directly"""
+    height, width = image.shape[:2]
+    return b'P6 %d %d 255\n' % (width, height) + np.ascontiguousarray(image).tobytes()
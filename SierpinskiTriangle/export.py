@@ -0,0 +1,133 @@
+import multiprocessing
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from density import DensityBuffer, shade
+
+
+# Independent random streams a render is split into. Fixed, rather than one
+# per worker, so the image is the same for any number of workers
+STREAMS = 64
+
+
+def image_bounds(ifs, margin=0.02):
+    """Attractor bounding box with a margin around it"""
+    x0, y0, x1, y1 = ifs.bounds()
+    pad = margin * max(x1 - x0, y1 - y0)
+    return x0 - pad, y0 - pad, x1 + pad, y1 + pad
+
+
+def split_streams(points, seed, streams=STREAMS):
+    """(seed, count) of each stream; children of SeedSequence(seed), sharing points evenly"""
+    seeds = np.random.SeedSequence(seed).spawn(streams)
+    counts = [points // streams + (i < points % streams) for i in range(streams)]
+    return [(child, count) for child, count in zip(seeds, counts) if count]
+
+
+def worker_histogram(ifs, streams, bounds, width, height, chunk=1 << 20):
+    """Count the points of each (seed, count) stream into one width x height histogram
+
+    Returns the counts with the points generated and the seconds taken.
+    Memory is one histogram plus one chunk of points, whatever the count.
+    """
+    start = time.perf_counter()
+    buffer = DensityBuffer.fitted(bounds, width, height)
+    for seed, count in streams:
+        game = ifs.game(ifs.fixed_point(), seed)
+        for points in game.chunks(count, chunk):
+            buffer.add(points)
+    return buffer.counts, buffer.total, time.perf_counter() - start
+
+
+def rate(count, seconds):
+    """count per second, infinite for a run too short to time"""
+    return count / seconds if seconds > 0 else float('inf')
+
+
+def render_histogram(ifs, points, width, height, seed=None, workers=1, bounds=None):
+    """Hit counts of points IFS points in a width x height image, summed over worker processes
+
+    The points are split into STREAMS seeded streams, dealt out to the
+    workers; each worker fills its own histogram and they are summed at the
+    end. Returns (counts, stats) with stats['workers'] holding the points,
+    seconds and points/sec of each worker.
+    """
+    bounds = bounds or image_bounds(ifs)
+    streams = split_streams(points, seed)
+    workers = max(1, min(workers, len(streams)))
+    jobs = [(ifs, streams[i::workers], bounds, width, height) for i in range(workers)]
+
+    start = time.perf_counter()
+    counts = np.zeros((height, width), dtype=np.int64)
+    per_worker = []
+    if workers == 1:
+        results = (worker_histogram(*job) for job in jobs)
+        pool = None
+    else:
+        pool = multiprocessing.get_context().Pool(workers)
+        results = pool.starmap(worker_histogram, jobs)
+    try:
+        for histogram, generated, seconds in results:
+            counts += histogram
+            per_worker.append({'points': generated, 'seconds': seconds, 'rate': rate(generated, seconds)})
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    seconds = time.perf_counter() - start
+    return counts, {'points': points, 'seconds': seconds, 'rate': rate(points, seconds), 'workers': per_worker}
+
+
+def measure_scaling(ifs, points, width, height, worker_counts, seed=0):
+    """Time the render with each worker count against a single-process render
+
+    Returns one dict per worker count with the run time, points/sec, the
+    speedup over one worker and the parallel efficiency (speedup / workers).
+    """
+    serial, serial_stats = render_histogram(ifs, points, width, height, seed, 1)
+    serial_time = serial_stats['seconds']
+
+    results = []
+    for workers in worker_counts:
+        stats = serial_stats
+        if workers != 1:
+            counts, stats = render_histogram(ifs, points, width, height, seed, workers)
+            if not np.array_equal(counts, serial):
+                raise RuntimeError(f"render with {workers} workers differs from the single-process render")
+        speedup = rate(serial_time, stats['seconds'])
+        results.append({
+            'workers': workers,
+            'seconds': stats['seconds'],
+            'rate': stats['rate'],
+            'speedup': speedup,
+            'efficiency': speedup / workers,
+        })
+    return results
+
+
+def write_png(path, image):
+    """Write an (h, w, 3) uint8 image as an 8-bit RGB PNG"""
+    height, width = image.shape[:2]
+    rows = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 0] = 0  # no filter
+    rows[:, 1:] = image.reshape(height, -1)
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    with open(path, 'wb') as file:
+        file.write(b'\x89PNG\r\n\x1a\n')
+        file.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        file.write(chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)))
+        file.write(chunk(b'IEND', b''))
+
+
+def save_image(path, counts, log_scale=True):
+    """Save counts as raw .npy hit counts, or anything else as a shaded PNG"""
+    if path.lower().endswith('.npy'):
+        np.save(path, counts)
+    else:
+        write_png(path, shade(counts, counts.max(), log_scale))
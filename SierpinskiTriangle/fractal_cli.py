@@ -0,0 +1,86 @@
+"""Render fractals to image files without Tk
+
+    python fractal_cli.py --points 1e9 --width 4096 --output sierpinski.png --workers 8
+    python fractal_cli.py --preset "Barnsley fern" --points 2e8 --width 2048 --output fern.npy
+    python fractal_cli.py --points 1e8 --width 2048 --scaling 1,2,4,8
+    python fractal_cli.py --depth 14 --width 4096 --output sierpinski_14.png
+"""
+import argparse
+import time
+
+from density import DensityBuffer
+from export import image_bounds, measure_scaling, render_histogram, save_image
+from ifs import presets
+from subdivision import fill, polygons
+
+# Same vertices and fitting box as the Tk app, so exports match what it shows
+VERTICES = [(400, 100), (200, 400), (600, 400)]
+PRESET_BOUNDS = (200, 100, 600, 400)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless fractal renderer")
+    parser.add_argument('--preset', choices=list(presets(VERTICES, PRESET_BOUNDS)), default="Sierpinski triangle",
+                        help="fractal to render")
+    parser.add_argument('--points', type=float, default=1e8, help="number of points, e.g. 1e9")
+    parser.add_argument('--width', type=int, default=2048, help="image width in pixels")
+    parser.add_argument('--height', type=int, default=None, help="image height in pixels (default: fit the fractal)")
+    parser.add_argument('--output', default="fractal.png", help="output file: .png image or .npy hit counts")
+    parser.add_argument('--linear', action='store_true', help="shade the PNG by hit count rather than its logarithm")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for a reproducible image")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes")
+    parser.add_argument('--scaling', help="comma-separated worker counts; report scaling instead of writing an image")
+    parser.add_argument('--depth', type=int, default=None, help="draw the exact set at this subdivision depth instead of random points")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    ifs = presets(VERTICES, PRESET_BOUNDS)[args.preset]
+    points = int(args.points)
+    bounds = image_bounds(ifs)
+    width = args.width
+    height = args.height or max(1, round(width * (bounds[3] - bounds[1]) / (bounds[2] - bounds[0])))
+
+    if args.scaling:
+        report_scaling(args, ifs, points, width, height)
+        return
+    if args.depth is not None:
+        export_subdivision(args, ifs, bounds, width, height)
+        return
+
+    counts, stats = render_histogram(ifs, points, width, height, args.seed, args.workers, bounds)
+    save_image(args.output, counts, not args.linear)
+    print(f"{ifs.name}: {points:,} points into {width}x{height} -> {args.output}")
+    for i, worker in enumerate(stats['workers']):
+        print(f"  Worker {i}: {worker['points']:,} points in {worker['seconds']:.2f} s  |  {worker['rate']:,.0f} points/s")
+    print(f"Time: {stats['seconds']:.2f} s  |  {stats['rate']:,.0f} points/s")
+
+
+def export_subdivision(args, ifs, bounds, width, height):
+    """Fill the depth-N polygons into the image; the same every time, no random points"""
+    if not ifs.outline:
+        raise SystemExit(f"{ifs.name} has no outline to subdivide")
+    start = time.perf_counter()
+    buffer = DensityBuffer.fitted(bounds, width, height)
+    for batch in polygons(ifs, ifs.outline, args.depth):
+        fill(buffer, batch)
+    save_image(args.output, buffer.counts, not args.linear)
+    elapsed = time.perf_counter() - start
+    print(f"{ifs.name}: depth {args.depth}, {buffer.total:,} polygons into {width}x{height} -> {args.output}")
+    print(f"Time: {elapsed:.2f} s  |  {buffer.total / elapsed:,.0f} polygons/s")
+
+
+def report_scaling(args, ifs, points, width, height):
+    """Print points/sec, speedup and efficiency per worker count"""
+    worker_counts = [int(n) for n in args.scaling.split(',')]
+    results = measure_scaling(ifs, points, width, height, worker_counts, args.seed or 0)
+    print(f"{ifs.name}: {points:,} points into {width}x{height}")
+    print(f"{'Workers':>8}  {'Time (s)':>9}  {'Points/s':>12}  {'Speedup':>8}  {'Efficiency':>10}")
+    for result in results:
+        print(f"{result['workers']:>8}  {result['seconds']:>9.3f}  {result['rate']:>12,.0f}  "
+              f"{result['speedup']:>8.2f}  {result['efficiency']:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
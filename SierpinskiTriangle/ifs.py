@@ -0,0 +1,189 @@
+import math
+
+import numpy as np
+
+
+# Steps a game takes as a single chain from its start point before it
+# starts splitting into parallel walkers
+WARMUP = 32
+
+
+class IFS:
+    """An iterated function system: affine maps picked at random with given probabilities
+
+    Each map is (a, b, c, d, e, f) for x' = a x + b y + e, y' = c x + d y + f,
+    the layout of Barnsley's tables. The maps are compiled into stacked
+    coefficient arrays so a whole batch of points is moved at once, each by
+    its own randomly picked map. outline is an optional polygon drawn as a
+    guide, e.g. the triangle's vertices.
+    """
+
+    def __init__(self, maps, probabilities=None, name="IFS", outline=()):
+        coefficients = np.asarray(maps, dtype=np.float64).reshape(-1, 6)
+        self.name = name
+        self.outline = [tuple(point) for point in outline]
+        self.a, self.b, self.c, self.d, self.e, self.f = coefficients.T
+        self.matrices = coefficients[:, :4].reshape(-1, 2, 2)
+        self.offsets = coefficients[:, 4:]
+        if probabilities is None:
+            probabilities = np.ones(len(coefficients))
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        self.probabilities = probabilities / probabilities.sum()
+        self.uniform = bool(np.all(self.probabilities == self.probabilities[0]))
+        self.cumulative = np.cumsum(self.probabilities)
+        self.cumulative[-1] = 1.0
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @classmethod
+    def toward(cls, points, ratio, name="IFS", **kwargs):
+        """Maps moving a point the fraction 1 - ratio of the way to each of points"""
+        maps = [(ratio, 0, 0, ratio, (1 - ratio) * x, (1 - ratio) * y) for x, y in points]
+        return cls(maps, name=name, outline=kwargs.pop('outline', points), **kwargs)
+
+    def pick(self, rng, count):
+        """count random map indices"""
+        if self.uniform:
+            return rng.integers(len(self), size=count)
+        return np.searchsorted(self.cumulative, rng.random(count), side='right')
+
+    def apply(self, points, index):
+        """Move each of an (n, 2) array of points by the map with the matching index"""
+        x, y = points[:, 0], points[:, 1]
+        moved = np.empty_like(points)
+        moved[:, 0] = self.a[index] * x + self.b[index] * y + self.e[index]
+        moved[:, 1] = self.c[index] * x + self.d[index] * y + self.f[index]
+        return moved
+
+    def fixed_point(self, index=0):
+        """The point a map leaves where it is, which lies on the attractor"""
+        return np.linalg.solve(np.eye(2) - self.matrices[index], self.offsets[index])
+
+    def ratios(self):
+        """Scale factor of each map if every map is a scaling (possibly by a negative factor), else None"""
+        m = self.matrices
+        if np.allclose(m[:, 0, 1], 0) and np.allclose(m[:, 1, 0], 0) and np.allclose(m[:, 0, 0], m[:, 1, 1]):
+            return m[:, 0, 0].copy()
+        return None
+
+    def game(self, start, seed=None, walkers=4096):
+        return IFSGame(self, start, seed, walkers)
+
+    def bounds(self, samples=100000, seed=0):
+        """(x0, y0, x1, y1) bounding box of the attractor, estimated from samples"""
+        points = self.game(self.fixed_point(), seed).take(samples)
+        (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+        return x0, y0, x1, y1
+
+    def transformed(self, scale_x, scale_y, shift_x, shift_y):
+        """The same system seen through p -> (scale_x x + shift_x, scale_y y + shift_y)"""
+        scale = np.array([scale_x, scale_y])
+        shift = np.array([shift_x, shift_y])
+        matrices = self.matrices * scale[:, None] / scale[None, :]
+        offsets = self.offsets * scale + shift - np.einsum('nij,j->ni', matrices, shift)
+        maps = np.concatenate([matrices.reshape(-1, 4), offsets], axis=1)
+        outline = [tuple(np.array(point) * scale + shift) for point in self.outline]
+        return IFS(maps, self.probabilities, self.name, outline)
+
+    def fitted(self, bounds, flip_y=False):
+        """The system scaled and centred to fill bounds (x0, y0, x1, y1), keeping its shape
+
+        flip_y turns it upside down, for systems written with y pointing up.
+        """
+        x0, y0, x1, y1 = self.bounds()
+        left, top, right, bottom = bounds
+        scale = min((right - left) / (x1 - x0), (bottom - top) / (y1 - y0))
+        scale_y = -scale if flip_y else scale
+        shift_x = (left + right) / 2 - scale * (x0 + x1) / 2
+        shift_y = (top + bottom) / 2 - scale_y * (y0 + y1) / 2
+        return self.transformed(scale, scale_y, shift_x, shift_y)
+
+
+class IFSGame:
+    """Points of an IFS generated in NumPy batches
+
+    The game starts as one chain from start, as the classic chaos game
+    does. After WARMUP steps, when the chain has settled onto the attractor,
+    it splits into copies that each continue with their own random maps,
+    doubling every round up to walkers chains. take(count) then moves a
+    whole batch of chains one step per vectorized update.
+    """
+
+    def __init__(self, ifs, start, seed=None, walkers=4096):
+        self.ifs = ifs
+        self.rng = np.random.default_rng(seed)
+        self.walkers = walkers
+        self.points = np.array([start], dtype=np.float64)
+        self.moved = 0   # chains moved this round; they sit at the end of points
+        self.rounds = 0
+
+    def take(self, count):
+        """The next count points as a (count, 2) float64 array"""
+        result = np.empty((max(count, 0), 2))
+        filled = 0
+        while filled < count:
+            if self.moved == len(self.points):
+                self.moved = 0
+                self.rounds += 1
+                if self.rounds > WARMUP and len(self.points) < self.walkers:
+                    self.points = np.concatenate((self.points, self.points))[:self.walkers]
+            size = min(len(self.points) - self.moved, count - filled)
+            moved = self.ifs.apply(self.points[:size], self.ifs.pick(self.rng, size))
+            self.points = np.concatenate((self.points[size:], moved))
+            self.moved += size
+            result[filled:filled + size] = moved
+            filled += size
+        return result
+
+    def chunks(self, count, chunk=65536):
+        """Yield count points in arrays of at most chunk points"""
+        while count > 0:
+            size = min(chunk, count)
+            count -= size
+            yield self.take(size)
+
+
+def sierpinski_triangle(vertices=((400, 100), (200, 400), (600, 400))):
+    return IFS.toward(vertices, 1 / 2, name="Sierpinski triangle")
+
+
+def sierpinski_carpet():
+    corners = [(0, 0), (1, 0), (1, 1), (0, 1)]
+    sides = [(0.5, 0), (1, 0.5), (0.5, 1), (0, 0.5)]
+    return IFS.toward(corners + sides, 1 / 3, name="Sierpinski carpet", outline=corners)
+
+
+def n_flake(n, centre=True, name=None):
+    """n regular n-gons shrunk towards the corners of one, touching but not overlapping
+
+    With centre, one more in the middle, turned half a turn for odd n so it
+    fits between the others (the pentaflake).
+    """
+    ratio = 1 / (2 * (1 + sum(math.cos(2 * math.pi * k / n) for k in range(1, n // 4 + 1))))
+    corners = [(math.cos(math.pi / 2 + 2 * math.pi * k / n), math.sin(math.pi / 2 + 2 * math.pi * k / n))
+               for k in range(n)]
+    maps = [(ratio, 0, 0, ratio, (1 - ratio) * x, (1 - ratio) * y) for x, y in corners]
+    if centre:
+        turn = -ratio if n % 2 else ratio
+        maps.append((turn, 0, 0, turn, 0, 0))
+    return IFS(maps, name=name or f"{n}-flake", outline=corners)
+
+
+def barnsley_fern():
+    maps = [(0, 0, 0, 0.16, 0, 0),
+            (0.85, 0.04, -0.04, 0.85, 0, 1.6),
+            (0.2, -0.26, 0.23, 0.22, 0, 1.6),
+            (-0.15, 0.28, 0.26, 0.24, 0, 0.44)]
+    return IFS(maps, [0.01, 0.85, 0.07, 0.07], name="Barnsley fern")
+
+
+def presets(vertices, bounds):
+    """The built-in systems by name, the triangle on vertices and the rest fitted to bounds"""
+    return {
+        "Sierpinski triangle": sierpinski_triangle(vertices),
+        "Sierpinski carpet": sierpinski_carpet().fitted(bounds),
+        "Pentaflake": n_flake(5, name="Pentaflake").fitted(bounds, flip_y=True),
+        "Hexaflake": n_flake(6, name="Hexaflake").fitted(bounds, flip_y=True),
+        "Barnsley fern": barnsley_fern().fitted(bounds, flip_y=True),
+    }
@@ -0,0 +1,106 @@
+import tempfile
+
+import numpy as np
+
+
+class PointBuffer:
+    """Growable (n, 2) array of points
+
+    extend appends a whole array at once, doubling the storage when it runs
+    out, so appends are amortized O(1) per point. With cap set the buffer
+    never holds more than cap points: it becomes a ring and the oldest
+    points are overwritten. Once the storage would pass memory_limit bytes
+    it moves to a memory-mapped temporary file in spill_dir, so runs larger
+    than RAM only need disk space.
+    """
+
+    def __init__(self, dtype=np.float32, capacity=4096, cap=None, memory_limit=None, spill_dir=None):
+        self.dtype = np.dtype(dtype)
+        self.cap = cap
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self.file = None
+        self.data = np.empty((min(capacity, cap or capacity), 2), dtype=self.dtype)
+        self.start = 0  # index of the oldest point once the ring has wrapped
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def capacity(self):
+        return len(self.data)
+
+    @property
+    def spilled(self):
+        return self.file is not None
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def reserve(self, capacity):
+        """Make room for at least capacity points (or cap, if smaller)"""
+        if self.cap is not None:
+            capacity = min(capacity, self.cap)
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, 2 * self.capacity)
+        if self.cap is not None:
+            capacity = min(capacity, self.cap)
+        points = self.array()
+        size = capacity * 2 * self.dtype.itemsize
+
+        if self.file is None and self.memory_limit is not None and size > self.memory_limit:
+            self.file = tempfile.TemporaryFile(dir=self.spill_dir)
+            self.file.truncate(size)
+            data = np.memmap(self.file, dtype=self.dtype, mode='r+', shape=(capacity, 2))
+            data[:self.count] = points
+        elif self.file is not None:
+            # Points are already in order at the front of the file; just map more of it
+            self.data.flush()
+            self.file.truncate(size)
+            data = np.memmap(self.file, dtype=self.dtype, mode='r+', shape=(capacity, 2))
+        else:
+            data = np.empty((capacity, 2), dtype=self.dtype)
+            data[:self.count] = points
+        self.data = data
+        self.start = 0
+
+    def extend(self, points):
+        """Append an (n, 2) array of points"""
+        points = np.asarray(points)
+        if self.cap is not None and len(points) > self.cap:
+            points = points[-self.cap:]
+        self.reserve(self.count + len(points))
+
+        capacity = self.capacity
+        end = (self.start + self.count) % capacity if self.count < capacity else self.start
+        first = min(len(points), capacity - end)
+        self.data[end:end + first] = points[:first]
+        self.data[:len(points) - first] = points[first:]
+
+        overflow = self.count + len(points) - capacity
+        if overflow > 0:
+            self.start = (self.start + overflow) % capacity
+            self.count = capacity
+        else:
+            self.count += len(points)
+
+    def array(self):
+        """The points in order, oldest first; a view unless the ring has wrapped"""
+        end = self.start + self.count
+        if end <= self.capacity:
+            return self.data[self.start:end]
+        return np.concatenate((self.data[self.start:], self.data[:end - self.capacity]))
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+
+    def close(self):
+        """Release the spill file, if any"""
+        if self.file is not None:
+            self.data = np.empty((0, 2), dtype=self.dtype)
+            self.file.close()
+            self.file = None
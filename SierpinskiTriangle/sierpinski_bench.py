@@ -0,0 +1,317 @@
+"""Benchmark the Sierpinski generator's point generation and redraws
+
+    python sierpinski_bench.py                                  # 1k to 10M points
+    python sierpinski_bench.py --points 1000,100000 --preset "Barnsley fern"
+    python sierpinski_bench.py --tk                             # real Tk, needs a display
+    python sierpinski_bench.py --output new.json --compare old.json
+
+The app runs headless against a stubbed tkinter whose canvas ignores
+drawing calls, so the times cover everything the app computes but not
+Tk's own drawing. With --tk the real Tk is used instead (e.g. under
+Xvfb). Every case starts from the same point with the same seed, so runs
+on different commits measure the same work. Results are written as JSON.
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import types
+
+import numpy as np
+
+from fractal_cli import PRESET_BOUNDS, VERTICES
+from ifs import presets
+
+
+DEFAULT_POINTS = [1000, 10000, 100000, 1000000, 10000000]
+CANVAS_SIZE = (976, 440)  # the stub canvas: the canvas area of the app's 1000x700 window
+START_POINT = (350.0, 300.0)
+REDRAWS = 20
+
+
+class StubWidget:
+    """Stands in for any Tk widget: accepts every option and ignores every call"""
+
+    def __init__(self, *args, **kwargs):
+        self.options = dict(kwargs)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+
+    def __getitem__(self, key):
+        return self.options.get(key)
+
+    def config(self, **kwargs):
+        self.options.update(kwargs)
+
+    configure = config
+
+
+class StubCanvas(StubWidget):
+    def winfo_width(self):
+        return CANVAS_SIZE[0]
+
+    def winfo_height(self):
+        return CANVAS_SIZE[1]
+
+
+class StubVar:
+    def __init__(self, master=None, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class StubRoot(StubWidget):
+    """Runs after() callbacks from a queue instead of an event loop"""
+
+    def __init__(self):
+        super().__init__()
+        self.queue = []
+
+    def after(self, delay, callback, *args):
+        self.queue.append(lambda: callback(*args))
+
+    def run(self):
+        while self.queue:
+            self.queue.pop(0)()
+
+
+def stub_tkinter():
+    tk = types.ModuleType('tkinter')
+    ttk = types.ModuleType('tkinter.ttk')
+    for name in ('Frame', 'Label', 'Entry', 'Scale', 'Button', 'Checkbutton', 'OptionMenu', 'PhotoImage'):
+        setattr(tk, name, StubWidget)
+    tk.Canvas = StubCanvas
+    tk.StringVar = tk.IntVar = tk.BooleanVar = StubVar
+    for name in ('BOTH', 'X', 'LEFT', 'RIGHT', 'RAISED', 'FLAT', 'SUNKEN', 'HORIZONTAL', 'NW'):
+        setattr(tk, name, name.lower())
+    ttk.Progressbar = StubWidget
+    tk.ttk = ttk
+    sys.modules['tkinter'] = tk
+    sys.modules['tkinter.ttk'] = ttk
+    return tk
+
+
+def load_app(real_tk):
+    """(SierpinskiTriangle class, function making a fresh window) with the real or the stubbed tkinter
+
+    With real Tk every case gets its own Toplevel of a hidden root, so each
+    app is laid out in a full 1000x700 window of its own.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    if real_tk:
+        import tkinter as tk
+        master = tk.Tk()
+        master.withdraw()
+        new_window = lambda: tk.Toplevel(master)
+    else:
+        stub_tkinter()
+        new_window = StubRoot
+    spec = importlib.util.spec_from_file_location("sierpinski_triangle", os.path.join(here, "Sierpinski triangle.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.SierpinskiTriangle, new_window
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sierpinski generator benchmark suite")
+    parser.add_argument('--points', help="comma-separated point counts (default: 1k up to 10M)")
+    parser.add_argument('--preset', choices=list(presets(VERTICES, PRESET_BOUNDS)), default="Sierpinski triangle",
+                        help="fractal to generate")
+    parser.add_argument('--seed', type=int, default=12345, help="seed for the chaos game")
+    parser.add_argument('--redraws', type=int, default=REDRAWS, help="redraws timed per measurement")
+    parser.add_argument('--tk', action='store_true', help="use the real Tk (needs a display) instead of a stub")
+    parser.add_argument('--no-deep-zoom', action='store_true', help="skip the deep-zoom tile benchmark")
+    parser.add_argument('--output', default="sierpinski_bench.json", help="where to write the JSON results")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    return parser.parse_args(argv)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_queue(root):
+    """Run the app's pending after() callbacks until none are left"""
+    if isinstance(root, StubRoot):
+        root.run()
+        return
+    while root.tk.call('after', 'info'):
+        root.update()
+
+
+def make_app(app_class, new_window, preset, seed):
+    app = app_class(new_window())
+    if preset != app.ifs.name:
+        app.preset_var.set(preset)
+        app.select_preset(preset)
+    app.seed = seed
+    app.speed_var.set(2000)  # largest chunk per callback
+    app.current_point = START_POINT
+    app.root.update()  # lay the window out, so the canvas has its real size before anything is timed
+    return app
+
+
+def event(x, y, up=True):
+    return types.SimpleNamespace(x=x, y=y, delta=120 if up else -120, num=4 if up else 5)
+
+
+def time_redraws(app, callback, count):
+    """Milliseconds per call, averaged over count calls, including Tk's drawing when it is real"""
+    start = time.perf_counter()
+    for i in range(count):
+        callback(i)
+        app.root.update_idletasks()
+    return (time.perf_counter() - start) / count * 1000
+
+
+def time_interactions(app, redraws):
+    cx, cy = app.canvas.winfo_width() // 2, app.canvas.winfo_height() // 2
+    redraw_ms = time_redraws(app, lambda i: app.draw_initial_triangle(), redraws)
+    # Alternate in and out, so the zoom level stays put
+    zoom_ms = time_redraws(app, lambda i: app.on_mouse_wheel(event(cx, cy, up=i % 2 == 0)), redraws)
+    app.start_pan(event(cx, cy))
+    pan_ms = time_redraws(app, lambda i: app.pan_canvas(event(cx + (5 if i % 2 == 0 else 0), cy)), redraws)
+    return redraw_ms, zoom_ms, pan_ms
+
+
+def run_case(app_class, new_window, points, args):
+    app = make_app(app_class, new_window, args.preset, args.seed)
+    try:
+        return measure_case(app, points, args)
+    finally:
+        app.root.destroy()
+
+
+def measure_case(app, points, args):
+    # Engine alone: the batches generate_step consumes
+    game = app.ifs.game(START_POINT, args.seed)
+    start = time.perf_counter()
+    for chunk in game.chunks(points, 100000):
+        pass
+    engine_seconds = time.perf_counter() - start
+
+    # The app's own loop: generation, density buffer and a redraw per chunk
+    app.iterations_var.set(str(points))
+    start = time.perf_counter()
+    app.start_generation()
+    run_queue(app.root)
+    run_seconds = time.perf_counter() - start
+
+    redraw_ms, zoom_ms, pan_ms = time_interactions(app, args.redraws)
+    return {
+        'preset': args.preset,
+        'points': points,
+        'canvas': (app.canvas.winfo_width(), app.canvas.winfo_height()),
+        'engine_points_per_sec': points / engine_seconds,
+        'run_seconds': run_seconds,
+        'run_points_per_sec': points / run_seconds,
+        'redraw_ms': redraw_ms,
+        'zoom_ms': zoom_ms,
+        'pan_ms': pan_ms,
+    }
+
+
+def run_deep_zoom(app_class, new_window, args):
+    app = make_app(app_class, new_window, args.preset, args.seed)
+    try:
+        return measure_deep_zoom(app, args) if app.deep_zoom is not None else None
+    finally:
+        app.root.destroy()
+
+
+def measure_deep_zoom(app, args):
+    """Redraw times in deep-zoom mode: new tiles while zooming in, cached tiles while panning"""
+    app.deep_zoom_var.set(True)
+    app.on_deep_zoom()
+    x, y = app.transform_point(app.ifs.fixed_point())
+    zoom_ms = time_redraws(app, lambda i: app.on_mouse_wheel(event(x, y)), args.redraws)
+    cx, cy = app.canvas.winfo_width() // 2, app.canvas.winfo_height() // 2
+    app.start_pan(event(cx, cy))
+    pan_ms = time_redraws(app, lambda i: app.pan_canvas(event(cx + (5 if i % 2 == 0 else 0), cy)), args.redraws)
+    return {
+        'preset': args.preset,
+        'zoom_level': app.zoom_level,
+        'zoom_in_ms': zoom_ms,
+        'cached_pan_ms': pan_ms,
+        'tiles_rendered': app.tiles.misses,
+    }
+
+
+def print_comparison(results, deep_zoom, path):
+    with open(path) as f:
+        old = json.load(f)
+    baseline = {(r['preset'], r['points']): r for r in old['results']}
+    print(f"\nCompared with {path} (speedup, >1 is faster):")
+    for result in results:
+        before = baseline.get((result['preset'], result['points']))
+        if before is not None:
+            print(f"  {result['points']:>10,} points: run {result['run_points_per_sec'] / before['run_points_per_sec']:.2f}x, "
+                  f"redraw {before['redraw_ms'] / result['redraw_ms']:.2f}x, "
+                  f"zoom {before['zoom_ms'] / result['zoom_ms']:.2f}x, pan {before['pan_ms'] / result['pan_ms']:.2f}x")
+    before = old.get('deep_zoom')
+    if deep_zoom and before and before['preset'] == deep_zoom['preset']:
+        print(f"  deep zoom: zoom in {before['zoom_in_ms'] / deep_zoom['zoom_in_ms']:.2f}x, "
+              f"cached pan {before['cached_pan_ms'] / deep_zoom['cached_pan_ms']:.2f}x")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    counts = [int(float(n)) for n in args.points.split(',')] if args.points else list(DEFAULT_POINTS)
+    app_class, new_window = load_app(args.tk)
+
+    results = []
+    print(f"{'Points':>10} {'Engine pts/s':>13} {'Run pts/s':>12} {'Run s':>7} {'Redraw ms':>9} {'Zoom ms':>8} {'Pan ms':>7}")
+    for points in counts:
+        result = run_case(app_class, new_window, points, args)
+        results.append(result)
+        print(f"{points:>10,} {result['engine_points_per_sec']:>13,.0f} {result['run_points_per_sec']:>12,.0f} "
+              f"{result['run_seconds']:>7.2f} {result['redraw_ms']:>9.2f} {result['zoom_ms']:>8.2f} {result['pan_ms']:>7.2f}")
+
+    deep_zoom = None if args.no_deep_zoom else run_deep_zoom(app_class, new_window, args)
+    if deep_zoom is not None:
+        print(f"\nDeep zoom to level {deep_zoom['zoom_level']}: {deep_zoom['zoom_in_ms']:.1f} ms per zoom step "
+              f"({deep_zoom['tiles_rendered']} tiles), {deep_zoom['cached_pan_ms']:.2f} ms per cached pan")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+            'tk': 'real' if args.tk else 'stub',
+        },
+        'results': results,
+        'deep_zoom': deep_zoom,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        print_comparison(results, deep_zoom, args.compare)
+
+
+if __name__ == "__main__":
+    main()
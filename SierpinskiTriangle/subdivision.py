@@ -0,0 +1,99 @@
+import numpy as np
+
+
+# Pixels tested at once when filling polygons
+FILL_BATCH = 1 << 22
+
+
+def apply_maps(ifs, polygons):
+    """Every map of the IFS applied to every (m, 2) polygon: (maps * k, m, 2) from (k, m, 2)"""
+    moved = np.einsum('nij,kmj->nkmi', ifs.matrices, polygons) + ifs.offsets[:, None, None, :]
+    return moved.reshape(-1, *polygons.shape[1:])
+
+
+def levels(ifs, polygon, depth):
+    """Yield the images of polygon at each depth from 0 to depth, one (k, m, 2) array per level
+
+    Level d holds len(ifs) ** d polygons, which together are the exact
+    depth-d approximation of the attractor: for the Sierpinski triangle and
+    its own vertices, the 3^d triangles left after d subdivisions.
+    """
+    polygons = np.asarray(polygon, dtype=np.float64)[None]
+    yield polygons
+    for _ in range(depth):
+        polygons = apply_maps(ifs, polygons)
+        yield polygons
+
+
+def polygons(ifs, polygon, depth, batch_size=8192):
+    """Yield the depth-level polygons lazily, in batches of at most batch_size
+
+    Each batch is a whole number of levels, len(ifs) ** batch_depth
+    polygons. The last batch_depth levels of every branch are the same set
+    of shapes moved by the branch's own map, so those are built once with
+    levels and the branches above them are walked depth first, each
+    yielding that block under its composed map. Memory stays at one block
+    however deep.
+    """
+    batch_depth = 0
+    while batch_depth < depth and len(ifs) ** (batch_depth + 1) <= batch_size:
+        batch_depth += 1
+    for block in levels(ifs, polygon, batch_depth):
+        pass
+    top = depth - batch_depth
+    stack = [(0, np.eye(2), np.zeros(2))]
+    while stack:
+        level, matrix, offset = stack.pop()
+        if level == top:
+            yield np.einsum('ij,kmj->kmi', matrix, block) + offset
+            continue
+        # Pushed in reverse so batches come out in address order
+        for inner, shift in zip(ifs.matrices[::-1], ifs.offsets[::-1]):
+            stack.append((level + 1, matrix @ inner, matrix @ shift + offset))
+
+
+def count(ifs, depth):
+    """Number of polygons at depth"""
+    return len(ifs) ** depth
+
+
+def fill(buffer, polygons):
+    """Add 1 to every bin of a DensityBuffer whose centre lies inside each convex polygon
+
+    A polygon too small to contain any bin centre still adds 1 to the bin
+    holding its centroid, so the finest levels don't vanish.
+    """
+    corners = (polygons - (buffer.x0, buffer.y0)) * buffer.scale
+    low = np.floor(corners.min(axis=1)).astype(np.int64)
+    span = (np.floor(corners.max(axis=1)).astype(np.int64) - low + 1).max(axis=0)
+    step = max(1, FILL_BATCH // int(span[0] * span[1]))
+    for start in range(0, len(corners), step):
+        fill_batch(buffer, corners[start:start + step], low[start:start + step], span)
+
+
+def fill_batch(buffer, corners, low, span):
+    """fill for polygons already in bin coordinates, testing a span-sized grid of bins from low"""
+    gx, gy = np.arange(span[0]), np.arange(span[1])
+    bx = low[:, 0, None, None] + gx[None, None, :]   # (k, 1, gx)
+    by = low[:, 1, None, None] + gy[None, :, None]   # (k, gy, 1)
+    cx, cy = bx + 0.5, by + 0.5
+
+    # Inside a convex polygon: on the same side of every edge as its winding
+    edges = np.roll(corners, -1, axis=1) - corners
+    area = (corners[:, :, 0] * np.roll(corners[:, :, 1], -1, axis=1)
+            - np.roll(corners[:, :, 0], -1, axis=1) * corners[:, :, 1]).sum(axis=1)
+    winding = np.where(area < 0, -1.0, 1.0)[:, None, None]
+    inside = np.ones((len(corners), len(gy), len(gx)), dtype=bool)
+    for j in range(corners.shape[1]):
+        ex, ey = edges[:, j, 0, None, None], edges[:, j, 1, None, None]
+        px, py = corners[:, j, 0, None, None], corners[:, j, 1, None, None]
+        inside &= (ex * (cy - py) - ey * (cx - px)) * winding >= 0
+
+    empty = ~inside.any(axis=(1, 2))
+    centroid = np.floor(corners[empty].mean(axis=1)).astype(np.int64)
+    xs = np.concatenate([np.broadcast_to(bx, inside.shape)[inside], centroid[:, 0]])
+    ys = np.concatenate([np.broadcast_to(by, inside.shape)[inside], centroid[:, 1]])
+    keep = (xs >= 0) & (xs < buffer.width) & (ys >= 0) & (ys < buffer.height)
+    np.add.at(buffer.counts.reshape(-1), ys[keep] * buffer.width + xs[keep], 1)
+    buffer.total += len(corners)
+    buffer.table = None